@@ -0,0 +1,38 @@
+"""Time the forecast-accuracy join and error statistics over months of stored hourly history.
+
+Run with `python benchmarks/bench_accuracy.py` from the repository root.
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+from bench_history import DAYS, seed  # noqa: E402
+
+from weather.helpers import accuracy, history  # noqa: E402
+
+REPEATS = 10
+
+
+def main():
+    history.history_path = tempfile.mkdtemp()
+    end = np.datetime64("2024-06-01T00:00", "m")
+    seed("BENCH", end)
+    start = end - np.timedelta64(DAYS, "D")
+    forecasts, observed = history.read("BENCH", "hourly", start, end), history.read("BENCH", "observed", start, end)
+    print(f"{len(forecasts)} forecasts and {len(observed)} observations over {DAYS} days")
+    for name, fn in [
+        ("read + stats", lambda: accuracy.alias_accuracy("BENCH", start, end)),
+        ("stats only", lambda: accuracy.error_stats(forecasts, observed)),
+    ]:
+        t = min(timeit.repeat(fn, number=REPEATS, repeat=3)) / REPEATS
+        print(f"{name:>13}: {t * 1000:7.2f} ms")
+    print(accuracy.format_stats("BENCH", accuracy.alias_accuracy("BENCH", start, end)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare list.index time alignment against the searchsorted join in forecast.align.
+
+Run with `python benchmarks/bench_align.py` from the repository root.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from weather.helpers import forecast, scrape  # noqa: E402
+
+REPEATS = 5
+
+
+def synthetic_week(days=7, gap_fraction=0.1, seed=0):
+    """Hourly observations over days with a fraction of hours dropped, plus the full hourly grid."""
+    rng = np.random.default_rng(seed)
+    grid = np.datetime64("2022-07-01T00:00", "m") + np.arange(days * 24) * forecast.one_hour
+    kept = np.sort(rng.permutation(len(grid))[: int(len(grid) * (1 - gap_fraction))])
+    obs = {"validTimeLocal": grid[kept]}
+    for attr in scrape.hour_attrs[1:]:
+        if attr in forecast.categories:
+            obs[attr] = rng.integers(0, len(forecast.categories[attr]), len(kept)).astype(forecast.code_dtype)
+        else:
+            obs[attr] = rng.uniform(0, 100, len(kept)).astype(forecast.value_dtype)
+    return grid, obs
+
+
+def list_index(times, obs):
+    """The previous approach: two linear scans of the observation times per requested hour."""
+    obs_times = obs["validTimeLocal"].tolist()
+    obs_lists = {k: v.tolist() for k, v in obs.items()}
+    ordered = {k: [] for k in obs}
+    for t in times.tolist():
+        if t in obs_times:
+            idx = obs_times.index(t)
+            for k in ordered:
+                ordered[k].append(obs_lists[k][idx])
+    return ordered
+
+
+def main():
+    for days in [7, 28, 90]:
+        grid, obs = synthetic_week(days=days)
+        aligned = forecast.align(grid, obs)
+        found = ~np.isnan(aligned["temperature"])
+        assert np.array_equal(aligned["temperature"][found], np.asarray(list_index(grid, obs)["temperature"]))
+        old = min(timeit.repeat(lambda: list_index(grid, obs), number=REPEATS, repeat=3)) / REPEATS
+        new = min(timeit.repeat(lambda: forecast.align(grid, obs), number=REPEATS, repeat=3)) / REPEATS
+        print(
+            f"{days:>3} days ({len(grid)} hours): list.index {old * 1000:8.2f} ms, "
+            f"searchsorted {new * 1000:6.3f} ms, {old / new:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Wall time of pipeline.get_forecasts as the number of locations grows, against a slow local stub.
+
+Run with `python benchmarks/bench_batch.py` from the repository root.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import fetch, pipeline  # noqa: E402
+
+DELAY = 0.2
+
+
+def main():
+    pages = {page: text.encode() for page, text in make_pages().items()}
+    server, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2]], delay=DELAY)
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    d = {"n_days": 2, "d": True, "tide": False, "no_cache": True}
+    for n in [1, 2, 4, 8, 16]:
+        loc_configs = [
+            {
+                "weather_hash": f"loc{i}",
+                "name": f"Location {i}",
+                "lat_lon": [40.71, -74.01],
+                "timezone": "America/New_York",
+            }
+            for i in range(n)
+        ]
+        start = time.perf_counter()
+        pipeline.get_forecasts(loc_configs, d, workers=3 * n)
+        elapsed = time.perf_counter() - start
+        print(f"{n:>3} locations: {elapsed * 1000:7.1f} ms ({DELAY * 1000:.0f} ms per request, {3 * n} requests)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
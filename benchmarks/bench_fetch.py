@@ -0,0 +1,61 @@
+"""Compare sequential page downloads against the pooled, concurrent fetch layer.
+
+Run with `python benchmarks/bench_fetch.py` from the repository root.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import fetch  # noqa: E402
+
+DELAY = 0.2
+REPEATS = 5
+
+
+def tide_stub(base_url):
+    return requests.get(f"{base_url}/tides").text
+
+
+def sequential(base_url, loc_config):
+    for page in fetch.pages:
+        requests.get(fetch.weather_url.format(page=page, weather_hash=loc_config["weather_hash"])).text
+    tide_stub(base_url)
+
+
+def concurrent(base_url, loc_config):
+    """Every page and the tides at once, as the pipeline's shared pool fetches a single location."""
+    with ThreadPoolExecutor(max_workers=len(fetch.pages) + 1) as executor:
+        futures = [
+            executor.submit(fetch.fetch_page, page, loc_config["weather_hash"], cache_mode="off")
+            for page in fetch.pages
+        ]
+        futures.append(executor.submit(tide_stub, base_url))
+        for future in futures:
+            future.result()
+
+
+def main():
+    server, base_url = start_stub_server(body=b"x" * 300_000, delay=DELAY)
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    loc_config = {"weather_hash": "stub"}
+    results = {}
+    for name, fn in [("sequential", sequential), ("concurrent", concurrent)]:
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            fn(base_url, loc_config)
+        results[name] = (time.perf_counter() - start) / REPEATS
+        print(f"{name:>12}: {results[name] * 1000:7.1f} ms per run ({DELAY * 1000:.0f} ms per request)")
+    print(f"{'speedup':>12}: {results['sequential'] / results['concurrent']:7.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Time local harmonic tide predictions, and optionally validate them against NOAA's own predictions.
+
+Run with `python benchmarks/bench_harmonic.py [STATION_ID]` from the repository root. Without a station,
+37 synthetic constituents are used; with one, its constituents and a week of NOAA predictions are downloaded
+(network required) and the local predictions are compared against them.
+"""
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+
+from weather.helpers import harmonics, tides  # noqa: E402
+
+REPEATS = 20
+
+
+def main():
+    begin = np.datetime64("2024-06-01T00:00", "m")
+    week = begin + np.arange(7 * 24 * 10) * tides.step
+    if len(sys.argv) > 1:
+        station_id = int(sys.argv[1])
+        station = harmonics.get_constituents(station_id, mode="off")
+        predictions = tides.download_predictions(station_id, begin.astype(object), (begin + 7 * 1440).astype(object))
+        print(f"station {station_id}: {harmonics.compare(station_id, predictions)}")
+    else:
+        rng = np.random.default_rng(0)
+        names = list(harmonics.base_constituents) + list(harmonics.compound_constituents)
+        station = {"constituents": {n: (rng.uniform(0.01, 1), rng.uniform(0, 360)) for n in names}, "datum_offset": 1}
+    fn = lambda: harmonics.predict(station["constituents"], week, station["datum_offset"])  # noqa: E731
+    t = min(timeit.repeat(fn, number=REPEATS, repeat=3)) / REPEATS
+    print(f"{len(station['constituents'])} constituents, {len(week)} 6-minute steps: {t * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
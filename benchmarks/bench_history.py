@@ -0,0 +1,50 @@
+"""Time week-long range queries against the local history store.
+
+Run with `python benchmarks/bench_history.py` from the repository root.
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+
+from weather.helpers import forecast, history  # noqa: E402
+
+DAYS = 90
+REPEATS = 100
+
+
+def seed(alias, end):
+    """Store DAYS of hourly observations, plus a 48-hour hourly forecast issued every hour, through history.append."""
+    rng = np.random.default_rng(0)
+    times = end - np.arange(DAYS * 24, 0, -1) * forecast.one_hour
+
+    def records(kind, issued, valid):
+        dtype = history.dtypes[kind]
+        out = np.zeros(len(valid), dtype=dtype)
+        out["issued"], out["validTimeLocal"] = issued, valid
+        for name in dtype.names[2:]:
+            out[name] = rng.integers(0, 100, len(valid))
+        return out
+
+    history.append(alias, "observed", records("observed", times, times))
+    for issued in times:
+        history.append(alias, "hourly", records("hourly", issued, issued + np.arange(48) * forecast.one_hour))
+
+
+def main():
+    history.history_path = tempfile.mkdtemp()
+    end = np.datetime64("2024-06-01T00:00", "m")
+    seed("BENCH", end)
+    start = end - np.timedelta64(7, "D")
+    for kind in ["observed", "hourly"]:
+        n = len(history.read("BENCH", kind, start, end))
+        t = min(timeit.repeat(lambda: history.read("BENCH", kind, start, end), number=REPEATS, repeat=3)) / REPEATS
+        print(f"{kind:>9}: {t * 1000:6.2f} ms to read one week ({n} records)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measure what -profile instrumentation costs, per timed call and over a whole cached pipeline run.
+
+"bare" calls the undecorated function (__wrapped__), "disabled" the decorated one with instrumentation off,
+as in every normal run, and "enabled" with it on.
+
+Run with `python benchmarks/bench_instrument.py` from the repository root.
+"""
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import cache, fetch, instrument, pipeline, scrape  # noqa: E402
+
+CALLS = 200_000
+RUNS = 200
+
+
+def main():
+    noop = instrument.timed(lambda: None)
+    sections = scrape.merge_sections(scrape.parse_sections(page) for page in make_pages().values())
+    hourly = scrape.get_weather_hourly
+
+    pages = {page: text.encode() for page, text in make_pages().items()}
+    server, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2]])
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    cache.cache_path = tempfile.mkdtemp()
+    loc_configs = [{"weather_hash": "stub", "name": "Stub", "lat_lon": [40.71, -74.01], "timezone": "America/New_York"}]
+    d = {"n_days": 2, "d": False, "tide": False}
+    pipeline.get_forecasts(loc_configs, d)
+
+    print(f"{'':>10}{'no-op call':>14}{'get_weather_hourly':>20}{'cached pipeline':>18}")
+    for name in ["bare", "disabled", "enabled"]:
+        if name == "enabled":
+            instrument.enable()
+        call = noop.__wrapped__ if name == "bare" else noop
+        parse = hourly.__wrapped__ if name == "bare" else hourly
+        per_call = min(timeit.repeat(call, number=CALLS, repeat=5)) / CALLS
+        per_parse = min(timeit.repeat(lambda: parse(sections), number=RUNS, repeat=5)) / RUNS
+        per_run = min(timeit.repeat(lambda: pipeline.get_forecasts(loc_configs, d), number=RUNS // 10, repeat=5))
+        per_run /= RUNS // 10
+        print(f"{name:>10}{per_call * 1e9:11.0f} ns{per_parse * 1e6:17.1f} us{per_run * 1000:15.2f} ms")
+    instrument.disable()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Time a bulk -import of many locations, validated one at a time and concurrently, against a slow local stub.
+
+Each location costs one page request; timezones are resolved locally. The config is written once per run.
+
+Run with `python benchmarks/bench_provision.py` from the repository root.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import configure, fetch, provision  # noqa: E402
+
+DELAY = 0.2
+N = 200
+
+
+def main():
+    page = make_pages()["hourbyhour"].encode()
+    server, base_url = start_stub_server(body=page, delay=DELAY)
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    entries = [{"alias": f"LOC{i}", "url": f"https://weather.com/weather/hourly/l/loc{i}"} for i in range(N)]
+    # warm the TimezoneFinder so neither run pays for loading it
+    configure.resolve_timezone((40.71, -74.01))
+
+    results = {}
+    for name, workers in [("sequential", 1), ("concurrent", provision.max_workers)]:
+        configure.config_path = f"{tempfile.mkdtemp()}/config.json"
+        start = time.perf_counter()
+        added, failed = provision.provision(entries, workers=workers)
+        results[name] = time.perf_counter() - start
+        print(f"{name:>10}: {results[name]:6.2f} s for {len(added)} locations ({len(failed)} failed, {workers} workers)")
+    print(f"{'speedup':>10}: {results['sequential'] / results['concurrent']:6.2f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
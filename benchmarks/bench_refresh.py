@@ -0,0 +1,68 @@
+"""Compare a full refresh against conditional requests with per-section reuse, as done by -watch.
+
+Every refresh revalidates all pages (page TTLs are set to zero). "full" runs against a server without
+ETags so every page is downloaded and decoded, "unchanged" gets 304s and reuses every decoded section, and
+"hourly changed" serves a new hourbyhour page each round so only its sections are decoded again.
+
+Run with `python benchmarks/bench_refresh.py` from the repository root.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import cache, fetch, pipeline  # noqa: E402
+
+REPEATS = 20
+
+
+def main():
+    pages, changed = make_pages(seed=0), make_pages(seed=1)
+    state = {"round": 0, "vary": False}
+
+    def body(path):
+        page = path.split("/")[2]
+        if state["vary"] and page == "hourbyhour" and state["round"] % 2:
+            return changed[page].encode()
+        return pages[page].encode()
+
+    plain_server, plain_url = start_stub_server(body=body)
+    etag_server, etag_url = start_stub_server(body=body, etags=True)
+    for page in fetch.pages:
+        cache.ttls[page] = 0
+    loc_configs = [{"weather_hash": "stub", "name": "Stub", "lat_lon": [40.71, -74.01], "timezone": "America/New_York"}]
+    d = {"n_days": 2, "d": True, "tide": False}
+
+    results = {}
+    for name, server, base_url, vary, memo in [
+        ("full", plain_server, plain_url, False, None),
+        ("unchanged", etag_server, etag_url, False, {}),
+        ("hourly changed", etag_server, etag_url, True, {}),
+    ]:
+        fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+        cache.cache_path = tempfile.mkdtemp()
+        state["vary"] = vary
+        pipeline.get_forecasts(loc_configs, d, memo=memo)
+        sent = server.bytes_sent
+        start, cpu_start = time.perf_counter(), time.process_time()
+        for i in range(REPEATS):
+            state["round"] = i + 1
+            pipeline.get_forecasts(loc_configs, d, memo=memo)
+        wall = (time.perf_counter() - start) / REPEATS
+        cpu = (time.process_time() - cpu_start) / REPEATS
+        kb = (server.bytes_sent - sent) / REPEATS / 1024
+        results[name] = wall
+        print(f"{name:>15}: {wall * 1000:7.2f} ms per refresh, {cpu * 1000:7.2f} ms CPU, {kb:7.0f} KB downloaded")
+    print(f"{'speedup':>15}: {results['full'] / results['unchanged']:7.2f}x unchanged")
+    plain_server.shutdown()
+    etag_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Per-image render time: a fresh pyplot figure per location against the reused Agg figure in render_images.
+
+Run with `python benchmarks/bench_render.py` from the repository root.
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+
+from weather.helpers import pipeline, plotting, scrape  # noqa: E402
+
+N_LOCATIONS = 24
+
+
+def fresh_pyplot(weather_dicts, d):
+    """The previous approach: new pyplot state for every image."""
+    outputs = []
+    for weather_dict in weather_dicts:
+        plt.rcParams.update(plotting.style)
+        fig, ax = plt.subplots()
+        plotting.draw_forecast(ax, weather_dict, d)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=100)
+        plt.close(fig)
+        outputs.append(buffer.getvalue())
+    return outputs
+
+
+def main():
+    page_sections = {page: scrape.parse_sections(text) for page, text in make_pages().items()}
+    for d in [{"n_days": 2, "d": True, "tide": False}, {"n_days": 7, "d": False, "tide": False}]:
+        loc_config = {"name": "Stub", "lat_lon": [40.71, -74.01], "timezone": "America/New_York"}
+        weather_dict = pipeline.build_forecast(loc_config, d, page_sections, {})
+        weather_dicts = [weather_dict] * N_LOCATIONS
+        plotting.render_images(weather_dicts[:1], d)  # warm font and glyph caches
+        for name, fn in [("fresh pyplot", fresh_pyplot), ("reused Agg", plotting.render_images)]:
+            start = time.perf_counter()
+            fn(weather_dicts, d)
+            per_image = (time.perf_counter() - start) / N_LOCATIONS
+            print(f"n_days={d['n_days']:>2} {name:>13}: {per_image * 1000:7.1f} ms per image")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Fetch many pages at once from a stub that throttles bursts, with and without the scheduler's limits.
+
+The stub answers with 429 beyond RATE requests per second. "no retries" fires everything at once and counts the
+failures, "retries only" recovers by backing off after each 429, and "rate limited" paces requests with the
+host's token bucket so the stub is never tripped. "coalesced" has many callers ask for the same page at once.
+
+Run with `python benchmarks/bench_scheduler.py` from the repository root.
+"""
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import fetch, scheduler  # noqa: E402
+
+DELAY = 0.1
+RATE = 20
+LOCATIONS = 32
+
+
+def fetch_all(jobs):
+    with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+        futures = [executor.submit(fetch.download_page, page, weather_hash) for page, weather_hash in jobs]
+        ok = 0
+        for future in futures:
+            try:
+                future.result()
+                ok += 1
+            except Exception:
+                pass
+    return ok
+
+
+def main():
+    pages = {page: text.encode() for page, text in make_pages().items()}
+    jobs = [(page, f"loc{i}") for i in range(LOCATIONS) for page in fetch.pages]
+    retries = scheduler.max_retries
+    for name, max_retries, limits in [
+        ("no retries", 0, {}),
+        ("retries only", retries, {}),
+        ("rate limited", retries, {"concurrency": 16, "rate": RATE * 0.75, "burst": RATE // 4}),
+    ]:
+        server, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2]], delay=DELAY, rate_limit=RATE)
+        fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+        scheduler.max_retries = max_retries
+        scheduler.host_limits["127.0.0.1"] = {**scheduler.default_limits, **limits}
+        scheduler._hosts.clear()
+        start = time.perf_counter()
+        ok = fetch_all(jobs)
+        wall = time.perf_counter() - start
+        print(
+            f"{name:>14}: {ok:3d}/{len(jobs)} pages in {wall:5.2f} s, "
+            f"{server.requests:4d} upstream requests, {server.throttled:4d} throttled"
+        )
+        server.shutdown()
+
+    server, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2]], delay=DELAY)
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    scheduler._hosts.clear()
+    start = time.perf_counter()
+    ok = fetch_all([("today", "loc0")] * 64)
+    wall = time.perf_counter() - start
+    print(f"{'coalesced':>14}: {ok:3d}/64 pages in {wall:5.2f} s, {server.requests:4d} upstream requests")
+    print(f"{'counters':>14}: {scheduler.counters()['127.0.0.1']}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
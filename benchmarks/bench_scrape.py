@@ -0,0 +1,140 @@
+"""Compare the legacy per-attribute regex scrapers over the concatenated soup against per-page section extraction.
+
+Run with `python benchmarks/bench_scrape.py` from the repository root.
+"""
+import re
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+from fixtures import make_pages  # noqa: E402
+
+from weather.helpers import forecast, scrape  # noqa: E402
+
+REPEATS = 50
+
+
+def legacy_list(search_str, attr, idx=0):
+    return re.findall(r'"{}\\":\[(.*?)\],'.format(attr), search_str)[idx].split(",")
+
+
+def legacy_hourly(soup):
+    start_loc = re.search(r"{}".format("getSunV3HourlyForecastWithHeadersUrlConfig"), soup).end(0)
+    search_str = soup[start_loc : start_loc + 15000]
+    weather_dict = {}
+    for a in scrape.hour_attrs:
+        match = re.search(r'"{}\\":\[(.*?)\],'.format(a), search_str)
+        obs_list = [x.strip('"\\') for x in match.group(1).split(",")]
+        if a not in ["validTimeLocal", "precipType", "windDirectionCardinal"]:
+            obs_list = [float(x) for x in obs_list]
+        weather_dict[a] = obs_list
+    weather_dict["validTimeLocal"] = [
+        datetime.strptime(x[:19], "%Y-%m-%dT%H:%M:%S") for x in weather_dict["validTimeLocal"]
+    ]
+    return weather_dict
+
+
+def legacy_daily(soup):
+    start_loc = re.search(r"getSunV3DailyForecastWithHeadersUrlConfig", soup).end(0)
+    search_str = soup[start_loc : start_loc + 30000]
+    obs = {}
+    for a in scrape.day_attrs:
+        obs_list = [x.strip('"\\') for x in legacy_list(search_str, a, idx=1)]
+        if a not in ["precipType", "windDirectionCardinal", "wxPhraseLong"]:
+            obs_list = [float(x) if x != "null" else x for x in obs_list]
+        if a not in ["calendarDayTemperatureMax", "calendarDayTemperatureMin"]:
+            obs_list = obs_list[::2]
+        obs[a] = obs_list
+    return obs
+
+
+def legacy_sun(soup):
+    start_loc = re.search(r"getSunV3DailyForecastWithHeadersUrlConfig", soup).end(0)
+    search_str = soup[start_loc : start_loc + 15000]
+    return {
+        a: [datetime.strptime(x.strip('"\\')[:19], "%Y-%m-%dT%H:%M:%S") for x in legacy_list(search_str, a)][:3]
+        for a in ["sunriseTimeLocal", "sunsetTimeLocal"]
+    }
+
+
+def legacy_almanac(soup, n_days):
+    dates = [date.today() + timedelta(days=i) for i in range(n_days)]
+    start_loc = re.search(r"getSunV3DailyAlmanacUrlConfig", soup).end(0)
+    search_str = soup[start_loc : start_loc + 10000]
+    temp_dict = {}
+    for a in ["almanacRecordDate", "temperatureAverageMin", "temperatureAverageMax"]:
+        value_str = re.search(r'"{}\\":\[(.*?)\]'.format(a), search_str).group(1)
+        if a == "almanacRecordDate":
+            temp_dict[a] = [
+                datetime.strptime(x.strip('"\\') + str(date.today().year), "%m%d%Y").date()
+                for x in value_str.split(",")
+            ]
+        else:
+            temp_dict[a] = [float(x) if x != "null" else float("NaN") for x in value_str.split(",")]
+    keep = [i for i, x in enumerate(temp_dict["almanacRecordDate"]) if x in dates]
+    return {k: [v[i] for i in keep] for k, v in temp_dict.items()}
+
+
+def legacy(soup):
+    return legacy_hourly(soup), legacy_daily(soup), legacy_sun(soup), legacy_almanac(soup, 7)
+
+
+def section_sun(sections):
+    """Sunrise and sunset from the daily forecast section, as scrape read them before solar.get_sun."""
+    data = scrape.get_section(sections, "getSunV3DailyForecastWithHeadersUrlConfig")
+    sun_dict = {}
+    for a in ["sunriseTimeLocal", "sunsetTimeLocal"]:
+        times = forecast.to_times(data[a])
+        sun_dict[a] = times[~np.isnat(times)][:3]
+    return sun_dict
+
+
+def single_pass(pages):
+    sections = scrape.merge_sections(scrape.parse_sections(page) for page in pages.values())
+    return (
+        scrape.get_weather_hourly(sections),
+        scrape.get_weather_daily(sections),
+        section_sun(sections),
+        scrape.get_historical_temperatures(sections, {"n_days": 7}),
+    )
+
+
+def agrees(old, new):
+    """Check legacy list output against the columnar arrays returned by the scrapers."""
+    for k, values in old.items():
+        column = new[k]
+        if k in forecast.categories:
+            column = forecast.decode(column, k)
+        if column.dtype.kind in "MU" or k == "almanacRecordDate":
+            expected = np.asarray(values, dtype=column.dtype)
+        else:
+            expected = np.asarray([np.nan if v == "null" else v for v in values], dtype=float)
+        if expected.dtype.kind == "f" and not np.allclose(expected, column, equal_nan=True):
+            return False
+        if expected.dtype.kind != "f" and not np.array_equal(expected, column):
+            return False
+    return True
+
+
+def main():
+    pages = make_pages()
+    soup = "".join(pages.values())
+    print(f"fixture size: {len(soup) / 1024:.0f} KB over {len(pages)} pages")
+
+    old, new = legacy(soup), single_pass(pages)
+    assert all(agrees(o, n) for o, n in zip(old, new)), "extractors disagree"
+
+    results = {}
+    for name, fn, arg in [("regex scans", legacy, soup), ("single pass", single_pass, pages)]:
+        results[name] = min(timeit.repeat(lambda: fn(arg), number=REPEATS, repeat=3)) / REPEATS
+        print(f"{name:>12}: {results[name] * 1000:7.2f} ms per run")
+    print(f"{'speedup':>12}: {results['regex scans'] / results['single pass']:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
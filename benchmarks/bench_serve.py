@@ -0,0 +1,110 @@
+"""Load-test -serve against a slow local weather.com stub.
+
+"cold burst" sends many identical requests at once to an empty server, which should coalesce them onto one
+pipeline run; "mixed" then has concurrent keep-alive clients request forecasts for several aliases and day
+counts. Both report latency and how many requests reached the stub. "one process per request" is the cost
+each caller paid before, running the pipeline on its own without a warm cache.
+
+Run with `python benchmarks/bench_serve.py` from the repository root.
+"""
+import asyncio
+import http.client
+import json
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from fixtures import make_pages  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import cache, configure, fetch, pipeline, server  # noqa: E402
+
+DELAY = 0.2
+ALIASES = ["LOC0", "LOC1", "LOC2", "LOC3"]
+BURST = 64
+CLIENTS = 32
+REQUESTS = 25
+
+
+def get_all(port, paths):
+    """GET each path over one keep-alive connection; return the per-request latencies."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    latencies = []
+    for path in paths:
+        start = time.perf_counter()
+        conn.request("GET", path)
+        response = conn.getresponse()
+        json.loads(response.read())
+        assert response.status == 200, path
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies
+
+
+def report(name, wall, latencies, upstream):
+    latencies = np.asarray(latencies) * 1000
+    print(
+        f"{name:>24}: {len(latencies):5d} requests in {wall:5.2f} s ({len(latencies) / wall:7.1f}/s), "
+        f"p50 {np.percentile(latencies, 50):6.1f} ms, p95 {np.percentile(latencies, 95):6.1f} ms, "
+        f"{upstream:4d} upstream requests"
+    )
+
+
+def main():
+    pages = {page: text.encode() for page, text in make_pages().items()}
+    stub, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2]], delay=DELAY, etags=True)
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    tmp = tempfile.mkdtemp()
+    configure.config_path = f"{tmp}/config.json"
+    cache.cache_path = f"{tmp}/cache"
+    loc_configs = {
+        alias: {
+            "weather_hash": alias.lower(),
+            "name": alias,
+            "lat_lon": [40.71, -74.01],
+            "timezone": "America/New_York",
+        }
+        for alias in ALIASES
+    }
+    configure.save_config(loc_configs)
+    d = {"n_days": 2, "d": False, "tide": False, "no_cache": False, "refresh": False}
+
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    port = asyncio.run_coroutine_threadsafe(server.start_server(d, port=0), loop).result().sockets[0].getsockname()[1]
+
+    with ThreadPoolExecutor(max_workers=BURST) as clients:
+        start = time.perf_counter()
+        latencies = sum(clients.map(lambda _: get_all(port, ["/forecast/LOC0?n_days=2"]), range(BURST)), [])
+        report("cold burst", time.perf_counter() - start, latencies, stub.requests)
+
+        paths = [
+            [f"/forecast/{ALIASES[(c + i) % len(ALIASES)]}?n_days={[1, 2, 7][i % 3]}" for i in range(REQUESTS)]
+            for c in range(CLIENTS)
+        ]
+        before = stub.requests
+        start = time.perf_counter()
+        latencies = sum(clients.map(lambda p: get_all(port, p), paths), [])
+        report("mixed", time.perf_counter() - start, latencies, stub.requests - before)
+
+    before = stub.requests
+    latencies = []
+    start = time.perf_counter()
+    for alias in ALIASES:
+        t = time.perf_counter()
+        pipeline.get_forecasts([loc_configs[alias]], {**d, "no_cache": True})
+        latencies.append(time.perf_counter() - t)
+    report("one process per request", time.perf_counter() - start, latencies, stub.requests - before)
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Measure `weather -list` startup time and break down its imports with `-X importtime`.
+
+Run with `python benchmarks/bench_startup.py` from the repository root.
+"""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPEATS = 10
+SRC = str(Path(__file__).parents[1] / "src")
+COMMAND = "import sys; sys.argv = ['weather', '-list']; from weather.weather import main; main()"
+
+
+def run(command, *flags):
+    env = {**os.environ, "PYTHONPATH": SRC}
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *flags, "-c", command], env=env, capture_output=True, text=True)
+    return time.perf_counter() - start, proc.stderr
+
+
+def import_breakdown(stderr, top=10):
+    """Parse `-X importtime` output into (cumulative_us, module) rows for top-level imports."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        if not module[1:].startswith(" "):
+            rows.append((int(cumulative), module.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    interpreter = min(run("pass")[0] for _ in range(REPEATS))
+    wall = min(run(COMMAND)[0] for _ in range(REPEATS))
+    print(f"bare interpreter: {interpreter * 1000:6.1f} ms")
+    print(f"weather -list:    {wall * 1000:6.1f} ms (best of {REPEATS})")
+    print("\nslowest top-level imports (cumulative):")
+    for cumulative, module in import_breakdown(run(COMMAND, "-X", "importtime")[1]):
+        print(f"  {cumulative / 1000:7.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Compare a per-run NOAA window request against the prefetched, interpolated tide cache.
+
+A stub station stands in for the NOAA API and sleeps DELAY seconds per request.
+Run with `python benchmarks/bench_tides.py` from the repository root.
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from weather.helpers import cache, tides  # noqa: E402
+
+DELAY = 0.3
+REPEATS = 20
+
+
+class StubStation:
+    requests = 0
+
+    def __init__(self, station_id):
+        self.station_id = station_id
+
+    def get_data(self, begin_date, end_date, **kwargs):
+        StubStation.requests += 1
+        time.sleep(DELAY)
+        times = pd.date_range(begin_date, pd.Timestamp(end_date) + pd.Timedelta(days=1), freq="6min", inclusive="left")
+        hours = (times - pd.Timestamp("2000-01-01")) / pd.Timedelta(hours=1)
+        level = np.cos(2 * np.pi * hours.to_numpy() / 12.42)
+        return pd.DataFrame({"predicted_wl": level}, index=pd.Index(times, name="date_time"))
+
+
+def main():
+    cache.cache_path = tempfile.mkdtemp()
+    loc_config = {"tide_station": 8518750, "timezone": "America/New_York"}
+    results = {}
+    for name, mode in [("no cache", "off"), ("cached", "use")]:
+        StubStation.requests = 0
+        start = time.perf_counter()
+        for i in range(REPEATS):
+            tides.get_tides(loc_config, {"n_days": 1 + i % 14, "no_cache": mode == "off"}, station=StubStation)
+        results[name] = (time.perf_counter() - start) / REPEATS
+        print(f"{name:>9}: {results[name] * 1000:7.1f} ms per run, {StubStation.requests} requests for {REPEATS} runs")
+    print(f"{'speedup':>9}: {results['no cache'] / results['cached']:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
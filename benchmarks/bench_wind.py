@@ -0,0 +1,53 @@
+"""Render time of the wind overlay: one Line2D per point against one scatter per arrow glyph.
+
+Run with `python benchmarks/bench_wind.py` from the repository root.
+"""
+
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from weather.helpers import forecast, plotting  # noqa: E402
+
+REPEATS = 10
+
+
+def per_point(ax, x, speeds, codes, color):
+    """The previous approach: a separate plot call, and Line2D artist, for every point."""
+    directions = forecast.decode(codes, "windDirectionCardinal")
+    for i in x[: len(directions)]:
+        if directions[i]:
+            ax.plot(i, speeds[i], color=color, marker=plotting.define_marker(directions[i]))
+
+
+def render(draw, n):
+    rng = np.random.default_rng(0)
+    x = np.arange(n)
+    speeds = rng.uniform(0, 25, n).astype(forecast.value_dtype)
+    codes = rng.integers(0, len(forecast.wind_directions), n).astype(forecast.code_dtype)
+    fig = Figure(figsize=(20, 7))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    start = time.perf_counter()
+    draw(ax, x, speeds, codes, "#3FBE34")
+    fig.savefig(io.BytesIO(), format="png", dpi=100)
+    return time.perf_counter() - start, len(ax.lines) + len(ax.collections)
+
+
+def main():
+    render(plotting.draw_wind, 8)  # warm glyph caches
+    for n in [14, 48, 336]:
+        for name, draw in [("per point", per_point), ("grouped scatter", plotting.draw_wind)]:
+            elapsed, artists = min(render(draw, n) for _ in range(REPEATS))
+            print(f"{n:>4} points {name:>16}: {elapsed * 1000:7.1f} ms, {artists:>4} artists")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Record weather.com pages and NOAA responses into a fixture set for benchmarks/suite.py.
+
+A fixture set is a directory under benchmarks/recorded holding the three weather.com pages, NOAA tide
+predictions, harmonic constituents and datums, and a manifest.json describing where and when they were captured.
+Sets are never overwritten, so results logged against a set stay comparable across commits.
+
+Run with `python benchmarks/capture.py URL STATION_ID [NAME]` from the repository root (network required), or
+`python benchmarks/capture.py --synthetic [NAME]` to write a set generated from fixtures.py.
+"""
+import json
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+from fixtures import make_pages  # noqa: E402
+
+from weather.helpers import fetch, harmonics, scrape, tides  # noqa: E402
+from weather.helpers.configure import resolve_timezone  # noqa: E402
+
+# bump when the layout of a fixture set changes
+FORMAT = 1
+RECORDED = Path(__file__).parent / "recorded"
+
+
+def write_set(path, pages, predictions, harcon, datums, manifest):
+    """Write one fixture set; predictions are {"time_utc", "water_level"} arrays, harcon and datums raw JSON text."""
+    if path.exists():
+        sys.exit(f"{path} already exists; fixture sets are never overwritten, so pick another NAME.")
+    path.mkdir(parents=True)
+    for page, text in pages.items():
+        (path / f"{page}.html").write_text(text)
+    np.savez(path / "predictions.npz", time_utc=predictions["time_utc"], water_level=predictions["water_level"])
+    (path / "harcon.json").write_text(harcon)
+    (path / "datums.json").write_text(datums)
+    (path / "manifest.json").write_text(json.dumps({"format": FORMAT, **manifest}, indent=2))
+    return path
+
+
+def capture(url, station_id, path):
+    weather_hash = Path(url.strip()).stem
+    pages = {page: fetch.download_page(page, weather_hash).text for page in fetch.pages}
+    location = scrape.parse_location(fetch.download_page("hourly", weather_hash).text)
+    begin = date.today() - timedelta(days=1)
+    predictions = tides.download_predictions(station_id, begin, begin + timedelta(days=tides.prefetch_days))
+    session = fetch.get_session()
+    harcon = session.get(harmonics.harcon_url.format(station=station_id), timeout=30)
+    datums = session.get(harmonics.datums_url.format(station=station_id), timeout=30)
+    harcon.raise_for_status()
+    datums.raise_for_status()
+    manifest = {
+        "captured": date.today().isoformat(),
+        "weather_hash": weather_hash,
+        "name": location["name"],
+        "lat_lon": location["lat_lon"],
+        "timezone": resolve_timezone(location["lat_lon"]),
+        "tide_station": station_id,
+    }
+    return write_set(path, pages, predictions, harcon.text, datums.text, manifest)
+
+
+def synthetic(path):
+    """Write a fixture set from the generated pages and a synthetic station, for use without network access."""
+    rng = np.random.default_rng(0)
+    begin = np.datetime64(date.today() - timedelta(days=1), "m")
+    time_utc = begin + np.arange((tides.prefetch_days + 1) * 24 * 10) * tides.step
+    hours = (time_utc - np.datetime64("2000-01-01T00:00")) / np.timedelta64(1, "h")
+    predictions = {"time_utc": time_utc, "water_level": (1 + np.cos(2 * np.pi * hours / 12.42)).astype(np.float32)}
+    names = list(harmonics.base_constituents) + list(harmonics.compound_constituents)
+    harcon = {
+        "HarmonicConstituents": [
+            {"name": name, "amplitude": rng.uniform(0.01, 1), "phase_GMT": rng.uniform(0, 360)} for name in names
+        ]
+    }
+    datums = {"datums": [{"name": "MSL", "value": 1.0}, {"name": "MLLW", "value": 0.0}]}
+    manifest = {
+        "captured": date.today().isoformat(),
+        "synthetic": True,
+        "weather_hash": "stub",
+        "name": "New York City, NY",
+        "lat_lon": [40.71, -74.01],
+        "timezone": "America/New_York",
+        "tide_station": 8518750,
+    }
+    return write_set(path, make_pages(), predictions, json.dumps(harcon), json.dumps(datums), manifest)
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--synthetic"]:
+        path = synthetic(RECORDED / (args[1] if len(args) > 1 else f"synthetic-{date.today().isoformat()}"))
+    elif len(args) in (2, 3):
+        path = capture(args[0], int(args[1]), RECORDED / (args[2] if len(args) > 2 else date.today().isoformat()))
+    else:
+        sys.exit(__doc__)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
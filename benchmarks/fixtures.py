@@ -0,0 +1,151 @@
+"""Synthetic weather.com pages for offline benchmarking.
+
+Pages mimic the live layout the scrapers target: a large HTML document whose
+`window.__data=JSON.parse("...")` script embeds the escaped `dal` state, with one
+entry per request parameter set under every `*UrlConfig` section.
+"""
+
+import json
+import random
+from datetime import date, datetime, timedelta
+
+cardinals = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+phrases = ["Sunny", "Partly Cloudy", "Mostly Cloudy", "Scattered Thunderstorms", "Showers", "Clear"]
+
+
+def iso(t):
+    return t.strftime("%Y-%m-%dT%H:%M:%S") + "-0400"
+
+
+def hourly_data(rng, start, hours):
+    times = [start + timedelta(hours=i) for i in range(hours)]
+    return {
+        "cloudCover": [rng.randint(0, 100) for _ in times],
+        "precipChance": [rng.randint(0, 100) for _ in times],
+        "precipType": [rng.choice(["rain", "snow", "precip"]) for _ in times],
+        "relativeHumidity": [rng.randint(20, 100) for _ in times],
+        "temperature": [rng.randint(50, 90) for _ in times],
+        "temperatureFeelsLike": [rng.randint(50, 95) for _ in times],
+        "validTimeLocal": [iso(t) for t in times],
+        "validTimeUtc": [int(t.timestamp()) for t in times],
+        "windDirectionCardinal": [rng.choice(cardinals) for _ in times],
+        "windSpeed": [rng.randint(0, 25) for _ in times],
+        "wxPhraseLong": [rng.choice(phrases) for _ in times],
+        "wxPhraseShort": [rng.choice(phrases)[:5] for _ in times],
+    }
+
+
+def daily_data(rng, days):
+    dates = [date.today() + timedelta(days=i) for i in range(days)]
+    first_night_only = datetime.now().hour >= 15
+
+    def daypart(values):
+        return [None if (i == 0 and first_night_only) else v for i, v in enumerate(values)]
+
+    return {
+        "calendarDayTemperatureMax": [rng.randint(70, 95) for _ in dates],
+        "calendarDayTemperatureMin": [rng.randint(45, 70) for _ in dates],
+        "dayOfWeek": [d.strftime("%A") for d in dates],
+        "sunriseTimeLocal": [
+            iso(datetime.combine(d, datetime.min.time()) + timedelta(hours=5, minutes=31)) for d in dates
+        ],
+        "sunsetTimeLocal": [
+            iso(datetime.combine(d, datetime.min.time()) + timedelta(hours=20, minutes=29)) for d in dates
+        ],
+        "validTimeLocal": [iso(datetime.combine(d, datetime.min.time()) + timedelta(hours=7)) for d in dates],
+        "daypart": [
+            {
+                "cloudCover": daypart([rng.randint(0, 100) for _ in range(2 * days)]),
+                "dayOrNight": daypart(["D", "N"] * days),
+                "precipChance": daypart([rng.randint(0, 100) for _ in range(2 * days)]),
+                "precipType": daypart([rng.choice(["rain", "snow"]) for _ in range(2 * days)]),
+                "windDirectionCardinal": daypart([rng.choice(cardinals) for _ in range(2 * days)]),
+                "windSpeed": daypart([rng.randint(0, 25) for _ in range(2 * days)]),
+                "wxPhraseLong": daypart([rng.choice(phrases) for _ in range(2 * days)]),
+                "wxPhraseShort": daypart([rng.choice(phrases)[:5] for _ in range(2 * days)]),
+            }
+        ],
+    }
+
+
+def almanac_data(rng, days=30):
+    dates = [date.today() + timedelta(days=i) for i in range(days)]
+    return {
+        "almanacRecordDate": [d.strftime("%m%d") for d in dates],
+        "temperatureAverageMax": [rng.randint(75, 85) for _ in dates],
+        "temperatureAverageMin": [rng.randint(55, 65) for _ in dates],
+        "temperatureRecordMax": [rng.randint(90, 105) for _ in dates],
+        "temperatureRecordMin": [rng.choice([None, rng.randint(35, 50)]) for _ in dates],
+    }
+
+
+def current_data(rng):
+    return {
+        "cloudCover": rng.randint(0, 100),
+        "precipType": "rain",
+        "relativeHumidity": rng.randint(20, 100),
+        "temperature": rng.randint(50, 90),
+        "temperatureFeelsLike": rng.randint(50, 95),
+        "validTimeLocal": iso(datetime.now().replace(minute=0, second=0, microsecond=0)),
+        "windDirectionCardinal": rng.choice(cardinals),
+        "windSpeed": rng.randint(0, 25),
+    }
+
+
+def filler_sections(rng, n=40):
+    """Unrelated dal sections so that each page is realistically large."""
+    return {
+        f"getSunV3Filler{i}UrlConfig": {
+            f"geocode:40.71,-74.01;language:en-US;units:e;slot:{i}": {
+                "loading": False,
+                "loaded": True,
+                "data": {"values": [rng.random() for _ in range(150)], "label": "x" * 200},
+            }
+        }
+        for i in range(n)
+    }
+
+
+def entry(params, data):
+    return {params: {"loading": False, "loaded": True, "data": data, "ttl": 600, "status": 200}}
+
+
+def render_page(dal, rng):
+    location = {"latitude": 40.71, "longitude": -74.01, "city": "New York"}
+    state = {"transactionId": "stub", "dal": dal, "location": location}
+    literal = json.dumps(json.dumps(state, separators=(",", ":")))
+    markup = "".join(f'<div class="card-{i}"><span>{"lorem ipsum " * 20}</span></div>' for i in range(400))
+    return (
+        "<!doctype html><html><head><title>Hourly Weather Forecast for New York City, NY - The Weather Channel"
+        f"</title></head><body>{markup}<script>window.__data=JSON.parse({literal});"
+        f"window.experience={{}};</script>{markup}</body></html>"
+    )
+
+
+def make_pages(seed=0):
+    """Return {page: html} for the three pages fetched per location."""
+    rng = random.Random(seed)
+    midnight = datetime.combine(date.today(), datetime.min.time())
+    next_hour = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    geo = "geocode:40.71,-74.01;language:en-US;units:e"
+    today = {
+        "getSunV3CurrentObservationsUrlConfig": entry(geo, current_data(rng)),
+        "getSunV3DailyForecastWithHeadersUrlConfig": {
+            **entry(f"duration:7day;{geo}", daily_data(rng, 7)),
+            **entry(f"duration:15day;{geo}", daily_data(rng, 15)),
+        },
+        "getSunV3DailyAlmanacUrlConfig": entry(f"days:30;{geo}", almanac_data(rng)),
+        **filler_sections(rng),
+    }
+    hourbyhour = {
+        "getSunV3HourlyForecastWithHeadersUrlConfig": entry(f"duration:2day;{geo}", hourly_data(rng, next_hour, 48)),
+        "getSunV3HistoricalOneDayHourlyConditionsUrlConfig": entry(
+            geo, hourly_data(rng, midnight, max(1, int((next_hour - midnight).total_seconds() // 3600)))
+        ),
+        **filler_sections(rng),
+    }
+    monthly = {**filler_sections(rng)}
+    return {
+        page: render_page(dal, rng)
+        for page, dal in [("today", today), ("hourbyhour", hourbyhour), ("monthly", monthly)]
+    }
@@ -0,0 +1,70 @@
+"""Local stand-in for upstream hosts, used by the benchmark scripts."""
+
+import hashlib
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def start_stub_server(body=b"<html></html>", delay=0.0, etags=False, rate_limit=None):
+    """Serve body for every GET after sleeping delay seconds; return (server, base_url).
+
+    With etags, responses carry an ETag and matching If-None-Match requests are answered with 304.
+    With rate_limit, requests beyond rate_limit in any one-second window are answered with 429, like a
+    throttling upstream. The number of requests handled, throttled and body bytes written are kept in
+    server.requests, server.throttled and server.bytes_sent.
+    """
+    recent, lock = deque(), threading.Lock()
+
+    def throttled():
+        with lock:
+            now = time.monotonic()
+            while recent and now - recent[0] > 1:
+                recent.popleft()
+            if len(recent) >= rate_limit:
+                server.throttled += 1
+                return True
+            recent.append(now)
+            return False
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server.requests += 1
+            if rate_limit is not None and throttled():
+                self.send_response(429)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            time.sleep(delay)
+            payload = body(self.path) if callable(body) else body
+            etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            if etags and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            if etags:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+            server.bytes_sent += len(payload)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    server.requests = 0
+    server.throttled = 0
+    server.bytes_sent = 0
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,151 @@
+"""Time the scrape parsers, tide predictions and Agg renders against a recorded fixture set, and log results per commit.
+
+Pages and NOAA responses are replayed from the set (see capture.py) through the local stub, so nothing touches the
+live sites. Each timing is the best per-call time over several rounds. Results are appended to
+benchmarks/results.jsonl with the git commit they were measured on, and compared against the latest clean run of a
+different commit on the same fixture set; timings more than THRESHOLD slower are flagged and the exit status is 1.
+
+The log is git-ignored, since timings are only comparable on one machine.
+
+Run with `python benchmarks/suite.py [FIXTURE_SET] [--no-log]` from the repository root. Without a set, the newest
+one under benchmarks/recorded is used (a synthetic set is committed there), or a synthetic set is generated in a
+temporary directory.
+"""
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+import numpy as np  # noqa: E402
+from capture import RECORDED, synthetic  # noqa: E402
+from stub import start_stub_server  # noqa: E402
+
+from weather.helpers import cache, fetch, harmonics, pipeline, plotting, scrape, tides  # noqa: E402
+
+LOG = Path(__file__).parent / "results.jsonl"
+THRESHOLD = 1.2
+ROUNDS = 5
+
+
+def git(*args):
+    return subprocess.run(["git", *args], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+
+
+def replay_predictions(path):
+    """The set's recorded predictions as a NOAA datagetter JSON response."""
+    recorded = np.load(path / "predictions.npz")
+    times = np.datetime_as_string(recorded["time_utc"], unit="m")
+    predictions = [{"t": t.replace("T", " "), "v": f"{v:.3f}"} for t, v in zip(times, recorded["water_level"])]
+    return json.dumps({"predictions": predictions}).encode()
+
+
+def best_ms(fn):
+    """Best per-call time in ms over ROUNDS rounds, each long enough (about 0.2 s) to time reliably."""
+    fn()
+    number, _ = timeit.Timer(fn).autorange()
+    return min(timeit.repeat(fn, number=number, repeat=ROUNDS)) / number * 1000
+
+
+def cases(path):
+    """Name -> zero-argument callable for every timed case, with the stub replaying the fixture set."""
+    manifest = json.loads((path / "manifest.json").read_text())
+    pages = {page: (path / f"{page}.html").read_text() for page in fetch.pages}
+    noaa = {
+        "harcon": (path / "harcon.json").read_bytes(),
+        "datums": (path / "datums.json").read_bytes(),
+        "predictions": replay_predictions(path),
+    }
+    responses = {**{page: text.encode() for page, text in pages.items()}, **noaa}
+    server, base_url = start_stub_server(body=lambda url: responses[url.split("/")[2]])
+    fetch.weather_url = base_url + "/weather/{page}/l/{weather_hash}"
+    harmonics.harcon_url = base_url + "/noaa/harcon/{station}"
+    harmonics.datums_url = base_url + "/noaa/datums/{station}"
+    tides.predictions_url = base_url + "/noaa/predictions/{station}?begin_date={begin}&end_date={end}"
+
+    loc_config = {k: manifest[k] for k in ["weather_hash", "name", "lat_lon", "timezone", "tide_station"]}
+    hourly_d = {"n_days": 2, "d": True, "tide": False, "no_cache": True}
+    daily_d = {"n_days": 7, "d": False, "tide": False, "no_cache": True}
+    page_sections = {page: scrape.parse_sections(text) for page, text in pages.items()}
+    sections = scrape.merge_sections(page_sections.values())
+    hourly = pipeline.build_forecast(loc_config, hourly_d, page_sections, {})
+    daily = pipeline.build_forecast(loc_config, daily_d, page_sections, {})
+    return server, {
+        "scrape.parse_sections": lambda: [scrape.parse_sections(text) for text in pages.values()],
+        "scrape.get_weather_hourly": lambda: scrape.get_weather_hourly(sections),
+        "scrape.get_weather_hourly_h": lambda: scrape.get_weather_hourly_h(sections),
+        "scrape.get_weather_daily": lambda: scrape.get_weather_daily(sections),
+        "scrape.get_historical_temperatures": lambda: scrape.get_historical_temperatures(sections, daily_d),
+        "tides.get_tides": lambda: tides.get_tides(loc_config, {"n_days": 2, "no_cache": True}),
+        "tides.get_tides -tide_model": lambda: tides.get_tides(loc_config, {"n_days": 2, "tide_model": True}),
+        "pipeline.get_forecasts": lambda: pipeline.get_forecasts([loc_config], hourly_d),
+        "plotting.render_images hourly": lambda: plotting.render_images([hourly], hourly_d),
+        "plotting.render_images daily": lambda: plotting.render_images([daily], daily_d),
+    }
+
+
+def baseline(fixtures, commit):
+    """The latest logged clean run on the same fixture set from another commit, if any."""
+    if not LOG.exists():
+        return None
+    runs = [json.loads(line) for line in LOG.read_text().splitlines() if line.strip()]
+    runs = [run for run in runs if run["fixtures"] == fixtures and run["commit"] != commit and not run["dirty"]]
+    return runs[-1] if runs else None
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if args:
+        path = Path(args[0])
+    elif RECORDED.exists() and any(RECORDED.iterdir()):
+        path = max(RECORDED.iterdir(), key=lambda p: json.loads((p / "manifest.json").read_text())["captured"])
+    else:
+        path = synthetic(Path(tempfile.mkdtemp()) / "synthetic")
+    cache.cache_path = tempfile.mkdtemp()
+
+    server, timed = cases(path)
+    results = {name: best_ms(fn) for name, fn in timed.items()}
+    server.shutdown()
+
+    commit, dirty = git("rev-parse", "--short", "HEAD"), bool(git("status", "--porcelain", "--untracked-files=no"))
+    previous = baseline(path.name, commit)
+    print(f"fixtures {path.name}, commit {commit}{' (dirty)' if dirty else ''}")
+    if previous is not None:
+        print(f"compared with {previous['commit']} from {previous['timestamp']}")
+    regressions = []
+    for name, ms in results.items():
+        line = f"{name:>36}: {ms:9.3f} ms"
+        if previous is not None and name in previous["results"]:
+            ratio = ms / previous["results"][name]
+            line += f"  {previous['results'][name]:9.3f} ms before, {100 * (ratio - 1):+6.1f}%"
+            if ratio > THRESHOLD:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if "--no-log" not in sys.argv:
+        entry = {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "fixtures": path.name,
+            "python": platform.python_version(),
+            "results": results,
+        }
+        with open(LOG, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
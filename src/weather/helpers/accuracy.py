@@ -0,0 +1,68 @@
+import numpy as np
+
+from weather.helpers import forecast, history
+
+variables = ["temperature", "temperatureFeelsLike", "relativeHumidity", "cloudCover", "windSpeed"]
+# lead time buckets in hours: [0, 6), [6, 12), [12, 24), [24, 48), [48, ...)
+lead_edges = np.array([0, 6, 12, 24, 48])
+
+
+def latest_observations(observed):
+    """Keep one observation per valid time (the last one stored), sorted by valid time."""
+    times = observed["validTimeLocal"][::-1]
+    _, first = np.unique(times, return_index=True)
+    return observed[::-1][first]
+
+
+def join(forecasts, observed):
+    """Match each forecast record to the observation at its valid time.
+
+    Returns (forecasts, observations, lead hours) for the forecasts that have an observation.
+    """
+    observed = latest_observations(observed)
+    obs_times = observed["validTimeLocal"]
+    if len(obs_times) == 0:
+        return forecasts[:0], observed, np.zeros(0)
+    pos = np.searchsorted(obs_times, forecasts["validTimeLocal"]).clip(max=len(obs_times) - 1)
+    found = obs_times[pos] == forecasts["validTimeLocal"]
+    forecasts = forecasts[found]
+    lead = forecast.hours_since(forecasts["validTimeLocal"], forecasts["issued"])
+    return forecasts, observed[pos[found]], lead
+
+
+def error_stats(forecasts, observed, variables=variables, edges=lead_edges):
+    """Bias and mean absolute error of forecasts against observations per variable and lead time bucket.
+
+    Returns {variable: {"n": counts, "bias": ..., "mae": ...}} with one entry per bucket in edges.
+    """
+    matched, obs, lead = join(forecasts, observed)
+    bucket = np.searchsorted(edges, lead, side="right") - 1
+    stats = {}
+    for v in variables:
+        err = matched[v].astype(np.float64) - obs[v]
+        keep = ~np.isnan(err) & (bucket >= 0)
+        n = np.bincount(bucket[keep], minlength=len(edges))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            bias = np.bincount(bucket[keep], weights=err[keep], minlength=len(edges)) / n
+            mae = np.bincount(bucket[keep], weights=np.abs(err[keep]), minlength=len(edges)) / n
+        stats[v] = {"n": n, "bias": bias, "mae": mae}
+    return stats
+
+
+def lead_labels(edges=lead_edges):
+    return [f"{lo}-{hi}h" for lo, hi in zip(edges[:-1], edges[1:])] + [f"{edges[-1]}h+"]
+
+
+def alias_accuracy(alias, start, end):
+    """Error statistics for every hourly forecast stored for alias with a valid time in [start, end)."""
+    return error_stats(history.read(alias, "hourly", start, end), history.read(alias, "observed", start, end))
+
+
+def format_stats(alias, stats):
+    labels = lead_labels()
+    lines = [f"\n{alias} forecast error (bias / MAE) by lead time:", f"{'':>22}" + "".join(f"{l:>16}" for l in labels)]
+    for v, s in stats.items():
+        cells = [f"{b:+6.1f} / {m:4.1f}" if n else f"{'-':>13}" for b, m, n in zip(s["bias"], s["mae"], s["n"])]
+        lines.append(f"{v:>22}" + "".join(f"{c:>16}" for c in cells))
+    lines.append(f"{'matched forecasts':>22}" + "".join(f"{n:>16}" for n in stats[variables[0]]["n"]))
+    return "\n".join(lines)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import pickle
+import time
+from contextlib import suppress
+from pathlib import Path
+
+from weather.helpers.configure import cache_path
+
+# seconds each source stays fresh; hourly pages move quickly, tide predictions barely at all
+ttls = {
+    "today": 10 * 60,
+    "hourbyhour": 10 * 60,
+    "monthly": 60 * 60,
+    "tides": 30 * 24 * 60 * 60,
+    "harcon": 365 * 24 * 60 * 60,
+    "timezone": 365 * 24 * 60 * 60,
+}
+max_cache_bytes = 64 * 1024 * 1024
+
+
+def cache_mode(d):
+    """Map parsed CLI arguments to one of 'use', 'refresh' or 'off'."""
+    if d.get("no_cache"):
+        return "off"
+    if d.get("refresh"):
+        return "refresh"
+    return "use"
+
+
+def entry_path(source, *key_parts):
+    key = hashlib.sha1(repr((source,) + key_parts).encode()).hexdigest()
+    return Path(cache_path) / f"{source}-{key}.pkl"
+
+
+def get_entry(source, *key_parts):
+    """Return (stored_at, value) for (source, key_parts) regardless of age, or None if missing."""
+    path = entry_path(source, *key_parts)
+    try:
+        with open(path, "rb") as f:
+            stored_at, value = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    # bump mtime so eviction drops least recently used entries first
+    os.utime(path)
+    return stored_at, value
+
+
+def get(source, *key_parts, ttl=None):
+    """Return the cached value for (source, key_parts), or None if missing or expired."""
+    stored = get_entry(source, *key_parts)
+    if stored is None or time.time() - stored[0] > (ttls[source] if ttl is None else ttl):
+        return None
+    return stored[1]
+
+
+def put(source, *key_parts, value):
+    os.makedirs(cache_path, exist_ok=True)
+    path = entry_path(source, *key_parts)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        pickle.dump((time.time(), value), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    evict()
+
+
+def evict(max_bytes=None):
+    """Drop least recently used entries until the cache fits within max_bytes."""
+    max_bytes = max_cache_bytes if max_bytes is None else max_bytes
+    entries = []
+    with os.scandir(cache_path) as it:
+        for entry in it:
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        with suppress(FileNotFoundError):
+            os.remove(path)
+        total -= size
+
+
+def cached(source, key_parts, fn, mode="use"):
+    """Serve fn() from the cache according to mode ('use', 'refresh' or 'off')."""
+    if mode == "use":
+        value = get(source, *key_parts)
+        if value is not None:
+            return value
+    value = fn()
+    if mode != "off":
+        put(source, *key_parts, value=value)
+    return value
@@ -1,10 +1,22 @@
+import copy
 import json
 import os
 import time
+from contextlib import contextmanager, suppress
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from weather.helpers import instrument
+
 PKG_PATH = Path(__file__).parents[1]
 config_path = f"{PKG_PATH}/.config/config.json"
+cache_path = f"{PKG_PATH}/.config/cache"
+history_path = f"{PKG_PATH}/.config/history"
 
 
 def timed_sleep(t=1):
@@ -14,18 +26,94 @@ def timed_sleep(t=1):
 halftab = " " * 4
 
 
+# parsed config.json, reused until the file's mtime or size changes
+_loaded = {}
+
+
+def load_config():
+    """Read config.json, reusing the parsed copy while the file is unchanged."""
+    try:
+        stat = os.stat(config_path)
+    except FileNotFoundError:
+        return {}
+    key = (config_path, stat.st_mtime_ns, stat.st_size)
+    if key not in _loaded:
+        with open(config_path, "r") as f:
+            config = json.load(f)
+        _loaded.clear()
+        _loaded[key] = config
+    return copy.deepcopy(_loaded[key])
+
+
 def init_config():
-    if not os.path.isfile(config_path):
-        os.makedirs(Path(config_path).parents[0], exist_ok=True)
-        config = {}
-    else:
-        config = json.load(open(config_path, "r"))
+    os.makedirs(Path(config_path).parents[0], exist_ok=True)
+    return load_config()
+
+
+@contextmanager
+def config_lock():
+    """Hold an exclusive lock on config.json for a read-modify-write (a no-op where fcntl is unavailable)."""
+    os.makedirs(Path(config_path).parents[0], exist_ok=True)
+    with open(f"{config_path}.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
 
-    json.dump(config, open(config_path, "w"))
+def save_config(config):
+    """Atomically replace config.json with config; returns False without writing when nothing changed."""
+    text = json.dumps(config)
+    with suppress(FileNotFoundError), open(config_path, "r") as f:
+        if f.read() == text:
+            return False
+    # readers only ever see the old or the new file, never a partial write
+    tmp_path = f"{config_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, config_path)
+    return True
 
+
+def update_config(fn):
+    """Apply fn to the current config and save its result under the config lock; returns the new config."""
+    with config_lock():
+        config = fn(load_config())
+        save_config(config)
     return config
 
 
+@lru_cache(maxsize=None)
+@instrument.timed
+def timezone_finder():
+    # loading the timezone polygons is expensive; do it at most once per process
+    import timezonefinder
+
+    return timezonefinder.TimezoneFinder()
+
+
+def resolve_timezone(lat_lon):
+    """Look up the IANA timezone name for a (latitude, longitude) pair."""
+    tf = timezone_finder()
+    lat, lng = lat_lon
+    return tf.certain_timezone_at(lat=lat, lng=lng) or tf.timezone_at(lat=lat, lng=lng)
+
+
+def location_timezone(loc_config):
+    """Timezone stored for a location, falling back to a cached lookup for configs saved before it was stored."""
+    if loc_config.get("timezone"):
+        return loc_config["timezone"]
+    from weather.helpers import cache
+
+    lat_lon = tuple(loc_config["lat_lon"])
+    return cache.cached("timezone", lat_lon, lambda: resolve_timezone(lat_lon))
+
+
 def reformat(string: str, input_type=None):
     """Reformat text inputs depending on type."""
     string = string.replace(". ", ".@")
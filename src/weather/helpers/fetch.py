@@ -0,0 +1,75 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from weather.helpers import cache, instrument, scheduler
+
+weather_url = "https://weather.com/weather/{page}/l/{weather_hash}"
+pages = ["today", "hourbyhour", "monthly"]
+
+_session = None
+
+
+def get_session():
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+# response headers kept with each cached page, sent back as the matching conditional request headers
+validator_headers = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+
+@instrument.timed
+def download_page(page, weather_hash, session=None, validators=None):
+    """GET a page, conditionally when validators from an earlier response are given.
+
+    Returns the response; its status is 304 with an empty body when the server confirms the page is unchanged.
+    """
+    session = session or get_session()
+    headers = {validator_headers[k]: v for k, v in (validators or {}).items()}
+    response = scheduler.get(weather_url.format(page=page, weather_hash=weather_hash), session, headers=headers)
+    response.raise_for_status()
+    return response
+
+
+def fetch_page(page, weather_hash, session=None, cache_mode="use"):
+    """Return page text, served from the on-disk cache while it is fresh.
+
+    Once the cached copy expires it is revalidated with a conditional request, so an unchanged page costs
+    a 304 round trip rather than a full download.
+    """
+    stored = cache.get_entry(page, weather_hash) if cache_mode != "off" else None
+    if stored is not None and not isinstance(stored[1], dict):
+        # written before validators were kept alongside the text
+        stored = None
+    if stored is not None:
+        stored_at, entry = stored
+        if cache_mode == "use" and time.time() - stored_at <= cache.ttls[page]:
+            instrument.count("cache_hits")
+            return entry["text"]
+    # -refresh forces a full download, so validators are only sent to revalidate an expired page
+    validators = stored[1]["validators"] if stored is not None and cache_mode == "use" else None
+    response = download_page(page, weather_hash, session, validators)
+    if response.status_code == 304:
+        instrument.count("not_modified")
+        entry = stored[1]
+    else:
+        entry = {
+            "text": response.text,
+            "validators": {k: response.headers[k] for k in validator_headers if k in response.headers},
+        }
+    if cache_mode != "off":
+        cache.put(page, weather_hash, value=entry)
+    return entry["text"]
+
+
+def fetch_and_parse(page, weather_hash, session=None, cache_mode="use", page_fn=None):
+    text = fetch_page(page, weather_hash, session, cache_mode)
+    return page_fn(text) if page_fn is not None else text
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+# weather_dict values are columnar arrays: datetime64[m] time axes, float32 values with NaN for
+# missing observations, and int8 codes (-1 for missing) indexing into the category lists below.
+time_dtype = "datetime64[m]"
+value_dtype = np.float32
+code_dtype = np.int8
+
+wind_directions = ["N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE", "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW"]
+precip_types = ["rain", "snow", "precip"]
+categories = {"precipType": precip_types, "windDirectionCardinal": wind_directions}
+
+one_hour = np.timedelta64(1, "h")
+
+
+def to_times(values):
+    """Parse ISO local timestamps (UTC offsets are dropped) into a datetime64 array."""
+    labels = np.asarray(values, dtype="U19")
+    labels[labels == "None"] = "NaT"
+    return labels.astype(time_dtype)
+
+
+def to_values(values):
+    """Convert a list of numbers (None for missing) into a float array holding NaN."""
+    return np.asarray(values, dtype=value_dtype)
+
+
+def to_labels(values):
+    labels = np.asarray(values, dtype="U")
+    return np.where(labels == "None", "", labels)
+
+
+def encode(values, attr):
+    """Map category labels onto int8 codes for attr; unknown and missing labels become -1."""
+    labels = np.asarray(values, dtype="U")
+    cats = np.asarray(categories[attr])
+    order = np.argsort(cats)
+    pos = np.searchsorted(cats[order], labels).clip(max=len(cats) - 1)
+    return np.where(cats[order][pos] == labels, order[pos], -1).astype(code_dtype)
+
+
+def decode(codes, attr):
+    """Map int8 codes back onto labels, with '' for missing."""
+    return np.asarray(categories[attr] + [""])[codes]
+
+
+def convert(values, attr):
+    """Convert raw scraped values for attr into the matching columnar array."""
+    if attr in categories:
+        return encode(values, attr)
+    if attr.endswith("TimeLocal"):
+        return to_times(values)
+    return to_values(values)
+
+
+def empty(attr, n):
+    """A length-n column of missing values for attr."""
+    if attr in categories:
+        return np.full(n, -1, dtype=code_dtype)
+    if attr.endswith("TimeLocal"):
+        return np.full(n, np.datetime64("NaT"), dtype=time_dtype)
+    return np.full(n, np.nan, dtype=value_dtype)
+
+
+def fit(values, n):
+    """Truncate or NaN-pad a float column to exactly n entries."""
+    out = np.full(n, np.nan, dtype=value_dtype)
+    out[: min(n, len(values))] = values[:n]
+    return out
+
+
+def hours_since(times, start):
+    return (times - start) / one_hour
+
+
+def hour_labels(times):
+    """Format datetime64 times as 12-hour 'HH:MM' labels."""
+    minutes = (times - times.astype("datetime64[D]")).astype("timedelta64[m]").astype(int)
+    hours = (minutes // 60 - 1) % 12 + 1
+    return np.char.add(
+        np.char.add(np.char.zfill(hours.astype("U2"), 2), ":"), np.char.zfill((minutes % 60).astype("U2"), 2)
+    )
+
+
+def local_now(timezone):
+    """The current wall-clock time in timezone, as a naive datetime64 comparable with scraped local times."""
+    return np.datetime64(datetime.now(ZoneInfo(timezone)).replace(tzinfo=None), "m")
+
+
+def utc_offsets(local_times, timezone):
+    """UTC offsets of local_times in timezone, looked up once per hour of the window."""
+    hours = local_times.astype("datetime64[h]")
+    unique_hours, inverse = np.unique(hours, return_inverse=True)
+    tz = ZoneInfo(timezone)
+    offsets = [tz.utcoffset(h.astype(datetime)) // timedelta(minutes=1) for h in unique_hours]
+    return np.asarray(offsets, dtype="timedelta64[m]")[inverse]
+
+
+def align(times, obs, time_attr="validTimeLocal"):
+    """Reindex the columns of obs onto times with a sorted (searchsorted) join.
+
+    Times without a matching observation get missing values; the returned time column is times itself.
+    """
+    obs_times = obs[time_attr]
+    order = np.argsort(obs_times, kind="stable")
+    sorted_times = obs_times[order]
+    pos = np.searchsorted(sorted_times, times).clip(max=max(len(sorted_times) - 1, 0))
+    found = sorted_times[pos] == times if len(sorted_times) else np.zeros(len(times), dtype=bool)
+    rows = order[pos][found]
+    aligned = {}
+    for attr, column in obs.items():
+        aligned[attr] = empty(attr, len(times))
+        aligned[attr][found] = column[rows]
+    aligned[time_attr] = times
+    return aligned
+
+
+def to_json(columns):
+    """Convert columnar arrays into JSON-ready lists: ISO times, category labels, and None for missing values."""
+    out = {}
+    for attr, column in columns.items():
+        if not isinstance(column, np.ndarray):
+            out[attr] = column
+        elif attr in categories:
+            out[attr] = [label or None for label in decode(column, attr).tolist()]
+        elif np.issubdtype(column.dtype, np.datetime64):
+            out[attr] = [None if label == "NaT" else label for label in np.datetime_as_string(column).tolist()]
+        elif np.issubdtype(column.dtype, np.floating):
+            values = column.astype(object)
+            values[np.isnan(column)] = None
+            out[attr] = values.tolist()
+        else:
+            out[attr] = column.tolist()
+    return out
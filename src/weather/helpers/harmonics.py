@@ -0,0 +1,163 @@
+import numpy as np
+
+from weather.helpers import cache, fetch, instrument, scheduler
+
+harcon_url = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations/{station}/harcon.json?units=metric"
+datums_url = "https://api.tidesandcurrents.noaa.gov/mdapi/prod/webapi/stations/{station}/datums.json?units=metric"
+
+# Schureman's equilibrium arguments for NOAA's 37 standard constituents. Each base constituent has
+# V coefficients over (T, s, h, p, p1, degrees), u coefficients over (xi, nu, nu', 2nu'', Q, R), and
+# node factor powers; compound constituents are sums of base ones.
+base_constituents = {
+    "SA": ((0, 0, 1, 0, 0, 0), (0, 0, 0, 0, 0, 0), {}),
+    "SSA": ((0, 0, 2, 0, 0, 0), (0, 0, 0, 0, 0, 0), {}),
+    "MM": ((0, 1, 0, -1, 0, 0), (0, 0, 0, 0, 0, 0), {"Mm": 1}),
+    "MF": ((0, 2, 0, 0, 0, 0), (-2, 0, 0, 0, 0, 0), {"Mf": 1}),
+    "2Q1": ((1, -4, 1, 2, 0, 90), (2, -1, 0, 0, 0, 0), {"O1": 1}),
+    "Q1": ((1, -3, 1, 1, 0, 90), (2, -1, 0, 0, 0, 0), {"O1": 1}),
+    "RHO": ((1, -3, 3, -1, 0, 90), (2, -1, 0, 0, 0, 0), {"O1": 1}),
+    "O1": ((1, -2, 1, 0, 0, 90), (2, -1, 0, 0, 0, 0), {"O1": 1}),
+    "M1": ((1, -1, 1, 0, 0, -90), (1, -1, 0, 0, 1, 0), {"O1": 1, "M1": 1}),
+    "P1": ((1, 0, -1, 0, 0, 90), (0, 0, 0, 0, 0, 0), {}),
+    "S1": ((1, 0, 0, 0, 0, 0), (0, 0, 0, 0, 0, 0), {}),
+    "K1": ((1, 0, 1, 0, 0, -90), (0, 0, -1, 0, 0, 0), {"K1": 1}),
+    "J1": ((1, 1, 1, -1, 0, -90), (0, -1, 0, 0, 0, 0), {"J1": 1}),
+    "OO1": ((1, 2, 1, 0, 0, -90), (-2, -1, 0, 0, 0, 0), {"OO1": 1}),
+    "2N2": ((2, -4, 2, 2, 0, 0), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "MU2": ((2, -4, 4, 0, 0, 0), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "N2": ((2, -3, 2, 1, 0, 0), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "NU2": ((2, -3, 4, -1, 0, 0), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "M2": ((2, -2, 2, 0, 0, 0), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "LAM2": ((2, -1, 0, 1, 0, 180), (2, -2, 0, 0, 0, 0), {"M2": 1}),
+    "L2": ((2, -1, 2, -1, 0, 180), (2, -2, 0, 0, 0, -1), {"M2": 1, "L2": 1}),
+    "T2": ((2, 0, -1, 0, 1, 0), (0, 0, 0, 0, 0, 0), {}),
+    "S2": ((2, 0, 0, 0, 0, 0), (0, 0, 0, 0, 0, 0), {}),
+    "R2": ((2, 0, 1, 0, -1, 180), (0, 0, 0, 0, 0, 0), {}),
+    "K2": ((2, 0, 2, 0, 0, 0), (0, 0, 0, -1, 0, 0), {"K2": 1}),
+    "M3": ((3, -3, 3, 0, 0, 0), (3, -3, 0, 0, 0, 0), {"M2": 1.5}),
+}
+compound_constituents = {
+    "MSF": {"S2": 1, "M2": -1},
+    "MK3": {"M2": 1, "K1": 1},
+    "2MK3": {"M2": 2, "K1": -1},
+    "M4": {"M2": 2},
+    "MN4": {"M2": 1, "N2": 1},
+    "MS4": {"M2": 1, "S2": 1},
+    "2SM2": {"S2": 2, "M2": -1},
+    "S4": {"S2": 2},
+    "M6": {"M2": 3},
+    "S6": {"S2": 3},
+    "M8": {"M2": 4},
+}
+node_factors = ["Mm", "Mf", "O1", "M1", "K1", "J1", "OO1", "M2", "L2", "K2"]
+
+
+def coefficients(name):
+    """Return (V coefficients, u coefficients, node factor powers) for a constituent name."""
+    if name in base_constituents:
+        v, u, f = base_constituents[name]
+        return np.asarray(v, dtype=float), np.asarray(u, dtype=float), np.asarray([f.get(k, 0) for k in node_factors])
+    parts = [coefficients(part) for part in compound_constituents[name]]
+    weights = list(compound_constituents[name].values())
+    return tuple(sum(w * part[i] for w, part in zip(weights, parts)) for i in range(3))
+
+
+def astronomical_arguments(time_utc):
+    """Mean longitudes (degrees) of the moon s, sun h, lunar perigee p, lunar node N and solar perigee p1,
+    plus the mean solar hour angle T, for datetime64 UTC times."""
+    hours = (time_utc - np.datetime64("2000-01-01T12:00")) / np.timedelta64(1, "h")
+    centuries = hours / (24 * 36525)
+    s = 218.3164477 + 481267.88123421 * centuries
+    h = 280.46646 + 36000.76983 * centuries
+    p = 83.3532465 + 4069.0137287 * centuries
+    N = 125.04452 - 1934.136261 * centuries
+    p1 = 282.94 + 1.7192 * centuries
+    # hour angle of the mean sun: 180 degrees at Greenwich midnight, so 0 at the noon epoch
+    T = 15 * hours
+    return T, s, h, p, N, p1
+
+
+def nodal_arguments(N, p):
+    """Schureman's nodal angles (degrees) and node factors for lunar node longitude N and perigee p."""
+    omega, i = np.radians(23.4393), np.radians(5.145)
+    N, p = np.radians(N), np.radians(p)
+    I = np.arccos(np.cos(i) * np.cos(omega) - np.sin(i) * np.sin(omega) * np.cos(N))
+    e1 = np.arctan(np.cos((omega - i) / 2) / np.cos((omega + i) / 2) * np.tan(N / 2)) - N / 2
+    e2 = np.arctan(np.sin((omega - i) / 2) / np.sin((omega + i) / 2) * np.tan(N / 2)) - N / 2
+    xi, nu = -(e1 + e2), e1 - e2
+    nup = np.arctan2(np.sin(2 * I) * np.sin(nu), np.sin(2 * I) * np.cos(nu) + 0.3347)
+    nupp2 = np.arctan2(np.sin(I) ** 2 * np.sin(2 * nu), np.sin(I) ** 2 * np.cos(2 * nu) + 0.0727)
+    P = p - xi
+    Q = np.arctan2((5 * np.cos(I) - 1) * np.sin(P), (7 * np.cos(I) + 1) * np.cos(P))
+    tan2 = np.tan(I / 2) ** 2
+    R = np.arctan2(np.sin(2 * P), 1 / (6 * tan2) - np.cos(2 * P))
+
+    f = {
+        "Mm": (2 / 3 - np.sin(I) ** 2) / 0.5021,
+        "Mf": np.sin(I) ** 2 / 0.1578,
+        "O1": np.sin(I) * np.cos(I / 2) ** 2 / 0.3800,
+        "M1": np.sqrt(
+            0.25 + 1.5 * np.cos(I) * np.cos(2 * P) / np.cos(I / 2) ** 2 + 2.25 * np.cos(I) ** 2 / np.cos(I / 2) ** 4
+        ),
+        "K1": np.sqrt(0.8965 * np.sin(2 * I) ** 2 + 0.6001 * np.sin(2 * I) * np.cos(nu) + 0.1006),
+        "J1": np.sin(2 * I) / 0.7214,
+        "OO1": np.sin(I) * np.sin(I / 2) ** 2 / 0.0164,
+        "M2": np.cos(I / 2) ** 4 / 0.9154,
+        "L2": np.sqrt(1 - 12 * tan2 * np.cos(2 * P) + 36 * tan2**2),
+        "K2": np.sqrt(19.0444 * np.sin(I) ** 4 + 2.7702 * np.sin(I) ** 2 * np.cos(2 * nu) + 0.0981),
+    }
+    u = np.degrees(np.stack([xi, nu, nup, nupp2, Q, R]))
+    return u, np.stack([f[k] for k in node_factors])
+
+
+@instrument.timed
+def predict(constituents, time_utc, datum_offset=0.0):
+    """Predicted water level at datetime64 UTC times from harmonic constituents.
+
+    constituents maps names to (amplitude, Greenwich phase in degrees); datum_offset is the mean sea level above
+    the chart datum. The sum is vectorized over times and constituents.
+    """
+    names = [name for name in constituents if name in base_constituents or name in compound_constituents]
+    coeffs = [coefficients(name) for name in names]
+    v_coeffs = np.stack([c[0] for c in coeffs])
+    u_coeffs = np.stack([c[1] for c in coeffs])
+    f_powers = np.stack([c[2] for c in coeffs])
+    amplitude = np.asarray([constituents[name][0] for name in names])
+    phase = np.asarray([constituents[name][1] for name in names])
+
+    T, s, h, p, N, p1 = astronomical_arguments(np.asarray(time_utc, dtype="datetime64[m]"))
+    V = v_coeffs[:, :5] @ np.stack([T, s, h, p, p1]) + v_coeffs[:, 5:]
+    u, f = nodal_arguments(N, p)
+    arguments = np.radians(V + u_coeffs @ u - phase[:, None])
+    # node factors are products of powers of the base factors, which are all positive
+    node = np.exp(f_powers @ np.log(f))
+    return datum_offset + np.sum(amplitude[:, None] * node * np.cos(arguments), axis=0)
+
+
+def download_constituents(station_id, datum="MLLW"):
+    session = fetch.get_session()
+    harcon = scheduler.get(harcon_url.format(station=station_id), session)
+    harcon.raise_for_status()
+    datums = scheduler.get(datums_url.format(station=station_id), session)
+    datums.raise_for_status()
+    levels = {level["name"]: level["value"] for level in datums.json()["datums"]}
+    return {
+        "constituents": {
+            c["name"]: (c["amplitude"], c["phase_GMT"]) for c in harcon.json()["HarmonicConstituents"] if c["amplitude"]
+        },
+        "datum_offset": levels["MSL"] - levels[datum],
+    }
+
+
+def get_constituents(station_id, mode="use"):
+    """Harmonic constituents and MSL-above-MLLW offset for a station, fetched once and then served from the cache."""
+    return cache.cached("harcon", (station_id,), lambda: download_constituents(station_id), mode=mode)
+
+
+def compare(station_id, predictions):
+    """Error of local harmonic predictions against NOAA predictions ({"time_utc", "water_level"} arrays)."""
+    station = get_constituents(station_id)
+    err = (
+        predict(station["constituents"], predictions["time_utc"], station["datum_offset"]) - predictions["water_level"]
+    )
+    return {"rmse": float(np.sqrt(np.mean(err**2))), "max_abs": float(np.max(np.abs(err)))}
@@ -0,0 +1,127 @@
+import os
+from contextlib import suppress
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from weather.helpers import forecast, instrument, scrape
+from weather.helpers.configure import history_path, location_timezone
+
+# every scraped series is appended to {history_path}/{alias}/{kind}/{YYYY-MM-DD}.bin as raw records of a
+# fixed structured dtype, partitioned by the day of validTimeLocal; "issued" is the hour the run saw it
+kinds = ["observed", "hourly", "daily"]
+
+
+def record_dtype(attrs):
+    fields = [("issued", forecast.time_dtype), ("validTimeLocal", forecast.time_dtype)]
+    for a in attrs:
+        if a in ["validTimeLocal", "wxPhraseLong"]:
+            continue
+        fields.append((a, forecast.code_dtype if a in forecast.categories else forecast.value_dtype))
+    return np.dtype(fields)
+
+
+dtypes = {
+    "observed": record_dtype(scrape.hour_attrs),
+    "hourly": record_dtype(scrape.hour_attrs),
+    "daily": record_dtype(scrape.day_attrs),
+}
+
+
+def partition_path(alias, kind, day):
+    return Path(history_path) / alias / kind / f"{day}.bin"
+
+
+def to_records(obs, kind, issued):
+    """Pack a dict of columns (with a validTimeLocal column) into a record array for kind."""
+    dtype = dtypes[kind]
+    times = obs["validTimeLocal"]
+    records = np.zeros(len(times), dtype=dtype)
+    records["issued"] = issued
+    for name in dtype.names[1:]:
+        records[name] = obs[name]
+    return records[~np.isnat(times)]
+
+
+def last_record(path, dtype):
+    with open(path, "rb") as f:
+        f.seek(-dtype.itemsize, os.SEEK_END)
+        return np.frombuffer(f.read(dtype.itemsize), dtype=dtype)[0]
+
+
+def append(alias, kind, records):
+    """Append records to their day partitions, skipping rows the store already holds.
+
+    Observations are only appended past the last stored valid time; a forecast issuance is written at most once.
+    """
+    dtype = dtypes[kind]
+    days = records["validTimeLocal"].astype("datetime64[D]")
+    for day in np.unique(days):
+        rows = records[days == day]
+        path = partition_path(alias, kind, day)
+        if path.exists() and path.stat().st_size >= dtype.itemsize:
+            last = last_record(path, dtype)
+            if kind == "observed":
+                rows = rows[rows["validTimeLocal"] > last["validTimeLocal"]]
+            elif last["issued"] == rows["issued"][0]:
+                continue
+        if len(rows):
+            os.makedirs(path.parent, exist_ok=True)
+            # one write per partition, so concurrent appenders never interleave partial records
+            with open(path, "ab") as f:
+                f.write(rows.tobytes())
+
+
+def read(alias, kind, start, end):
+    """Return stored records for alias and kind with start <= validTimeLocal < end, in stored order."""
+    dtype = dtypes[kind]
+    start, end = np.datetime64(start, "m"), np.datetime64(end, "m")
+    parts = []
+    for day in np.arange(start.astype("datetime64[D]"), end.astype("datetime64[D]") + 1):
+        path = partition_path(alias, kind, day)
+        if path.exists():
+            parts.append(np.fromfile(path, dtype=dtype))
+    records = np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+    return records[(records["validTimeLocal"] >= start) & (records["validTimeLocal"] < end)]
+
+
+def as_columns(records):
+    return {name: records[name] for name in records.dtype.names if name != "issued"}
+
+
+@instrument.timed
+def record(alias, sections, loc_config, issued=None):
+    """Append the hourly forecast, observed history and daily forecast in sections to the store.
+
+    Issuance times are in the location's local time, like the valid times they are compared against.
+    """
+    now = forecast.local_now(location_timezone(loc_config))
+    issued = now.astype("datetime64[h]").astype(forecast.time_dtype) if issued is None else issued
+    with suppress(ValueError):
+        append(alias, "hourly", to_records(scrape.get_weather_hourly(sections), "hourly", issued))
+    with suppress(ValueError):
+        data = scrape.get_section(sections, "getSunV3HistoricalOneDayHourlyConditionsUrlConfig")
+        observed = scrape.columns(data, scrape.hour_attrs)
+        observed = {k: v[observed["validTimeLocal"] < now] for k, v in observed.items()}
+        append(alias, "observed", to_records(observed, "observed", issued))
+    with suppress(ValueError):
+        daily = scrape.get_weather_daily(sections)
+        n = len(daily["calendarDayTemperatureMax"])
+        daily["validTimeLocal"] = (now.astype("datetime64[D]") + np.arange(n)).astype(forecast.time_dtype)
+        append(alias, "daily", to_records(daily, "daily", issued))
+
+
+@instrument.timed
+def backfill(alias, weather_dict, lookback_days=0):
+    """Extend an hourly weather_dict back by lookback_days and fill its missing past hours from stored observations."""
+    times = weather_dict["validTimeLocal"]
+    start = times[0] - np.timedelta64(lookback_days, "D")
+    grid = start + np.arange(lookback_days * 24 + len(times)) * forecast.one_hour
+    now = np.datetime64(datetime.now())
+    stored = forecast.align(grid, as_columns(read(alias, "observed", start, now)))
+    filled = forecast.align(grid, weather_dict)
+    missing = np.isnan(filled["temperature"]) & (grid < now)
+    for k in filled.keys():
+        filled[k][missing] = stored[k][missing]
+    return filled
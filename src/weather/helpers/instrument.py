@@ -0,0 +1,98 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# off unless -profile is given; while off, timed functions make one flag check and stage() does nothing
+enabled = False
+
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+
+
+def enable():
+    """Turn instrumentation on, clearing anything recorded earlier."""
+    global enabled
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def add(name, seconds):
+    with _lock:
+        calls, total = _stages.get(name, (0, 0.0))
+        _stages[name] = (calls + 1, total + seconds)
+
+
+def count(name, n=1):
+    """Add n to a named counter, such as bytes_downloaded."""
+    if enabled:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+@contextmanager
+def stage(name):
+    """Time a block of code as stage name."""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, time.perf_counter() - start)
+
+
+def timed(fn):
+    """Time every call of fn as a stage named module.function."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            add(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def snapshot():
+    """Recorded stages (calls, total and mean ms, in the order first seen) and counters, as a JSON-ready dict.
+
+    Stages that run on worker threads overlap, so their totals can add up to more than the wall time.
+    """
+    with _lock:
+        return {
+            "stages": {
+                name: {"calls": calls, "total_ms": 1000 * total, "mean_ms": 1000 * total / calls}
+                for name, (calls, total) in _stages.items()
+            },
+            "counters": dict(_counters),
+        }
+
+
+def report(fmt="text"):
+    """Print the snapshot as a per-stage table, or as JSON with fmt='json'."""
+    stats = snapshot()
+    if fmt == "json":
+        print(json.dumps(stats, indent=2))
+        return
+    print(f"\n\t{'stage':<40}{'calls':>8}{'total ms':>12}{'mean ms':>12}")
+    for name, stage_stats in stats["stages"].items():
+        print(f"\t{name:<40}{stage_stats['calls']:>8}{stage_stats['total_ms']:>12.1f}{stage_stats['mean_ms']:>12.2f}")
+    for name, value in stats["counters"].items():
+        print(f"\t{name:<40}{value:>8,}")
+    print("")
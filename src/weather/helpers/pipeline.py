@@ -0,0 +1,124 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+
+from weather.helpers import cache, fetch, history, instrument, scrape, solar, tides
+
+# bound on simultaneous downloads (and page parses) across all locations in a run
+max_workers = 12
+
+# guards the check-then-submit on a shared memo, so concurrent callers never start the same fetch twice
+memo_lock = threading.Lock()
+
+
+@instrument.timed
+def build_forecast(loc_config, d, page_sections, tide_dict, alias=None):
+    """Assemble the weather_dict for one location from its parsed pages and tide predictions.
+
+    With an alias, the scraped series are also appended to the local history store, which backs -d history.
+    """
+    sections = scrape.merge_sections(page_sections[page] for page in fetch.pages)
+    if alias is not None:
+        history.record(alias, sections, loc_config)
+
+    if d["n_days"] <= 2:
+        lookback = d.get("lookback", 0) if d["d"] else 0
+        if not d["d"]:
+            weather_dict = scrape.get_weather_hourly(sections)
+        else:
+            weather_dict = scrape.get_weather_hourly_h(sections)
+            if alias is not None:
+                weather_dict = history.backfill(alias, weather_dict, lookback)
+        weather_dict = {k: v[: (d["n_days"] + lookback) * 24] for k, v in weather_dict.items()}
+        sun_dict = solar.get_sun(loc_config, date.today() - timedelta(days=lookback), d["n_days"] + lookback + 1)
+        weather_dict.update(sun_dict)
+    else:
+        historical_temp_dict = scrape.get_historical_temperatures(sections, d)
+        weather_dict = scrape.get_weather_daily(sections)
+        weather_dict.update(historical_temp_dict)
+    weather_dict.update(tide_dict)
+
+    weather_dict["name"] = loc_config["name"]
+    return weather_dict
+
+
+def fresh(memo, key, source):
+    return memo is not None and key in memo and time.time() - memo[key][0] < cache.ttls[source]
+
+
+def memoized(executor, memo, key, source, fn):
+    """Return the memoized result for key while fresh, else submit fn to the executor.
+
+    The pending future is memoized as soon as it is submitted, so concurrent callers sharing the memo wait on
+    the same fetch instead of starting their own; a failed future is dropped so the next call retries.
+    """
+    with memo_lock:
+        if fresh(memo, key, source):
+            return memo[key][1]
+        future = executor.submit(fn)
+        if memo is not None:
+            memo[key] = (time.time(), future)
+            future.add_done_callback(partial(forget_failure, memo, key))
+    return future
+
+
+def forget_failure(memo, key, future):
+    if future.exception() is not None and memo.get(key, (None, None))[1] is future:
+        del memo[key]
+
+
+@instrument.timed
+def get_forecasts(loc_configs, d, workers=None, memo=None, aliases=None):
+    """Fetch, parse and assemble forecasts for every location, sharing one bounded worker pool.
+
+    Pages are parsed on the worker that downloaded them, so parsing overlaps with the remaining downloads.
+    A long-running caller can pass the same memo dict on every call to keep parsed pages and tide
+    predictions in memory; only sources whose TTL has expired are then fetched again, and of those
+    only the sections whose content changed are decoded again.
+    Concurrent calls may share a memo; a page or tide fetch already in flight is then awaited, not repeated.
+    Passing the locations' aliases records every run in the local history store.
+    """
+    cache_mode = cache.cache_mode(d)
+    with ThreadPoolExecutor(max_workers=workers or max_workers) as executor:
+        jobs = []
+        for loc_config in loc_configs:
+            page_futures = {}
+            for page in fetch.pages:
+                key = (page, loc_config["weather_hash"])
+                page_fn = scrape.parse_sections
+                if memo is not None:
+                    page_fn = partial(scrape.parse_sections, memo=memo.setdefault(("sections",) + key, {}))
+                fn = partial(fetch.fetch_and_parse, page, loc_config["weather_hash"], None, cache_mode, page_fn)
+                page_futures[page] = memoized(executor, memo, key, page, fn)
+            tide_future = None
+            if "tide_station" in loc_config.keys() and d["tide"]:
+                tide_future = memoized(
+                    executor, memo, tide_key(loc_config, d), "tides", partial(tides.get_tides, loc_config, d)
+                )
+            jobs.append((loc_config, page_futures, tide_future))
+
+        weather_dicts = []
+        for (loc_config, page_futures, tide_future), alias in zip(jobs, aliases or [None] * len(jobs)):
+            page_sections = {page: result(future) for page, future in page_futures.items()}
+            tide_dict = result(tide_future) if tide_future is not None else {}
+            weather_dicts.append(build_forecast(loc_config, d, page_sections, tide_dict, alias))
+    return weather_dicts
+
+
+def tide_key(loc_config, d):
+    # tides.get_tides builds its window from today's date, so a memoized window must not outlive the day
+    return ("tides", loc_config["tide_station"], d["n_days"], bool(d.get("tide_model")), date.today())
+
+
+def get_tides(loc_config, d, memo=None):
+    """Tide predictions for one location, memoized like the pages fetched by get_forecasts."""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return result(
+            memoized(executor, memo, tide_key(loc_config, d), "tides", partial(tides.get_tides, loc_config, d))
+        )
+
+
+def result(value):
+    return value.result() if isinstance(value, Future) else value
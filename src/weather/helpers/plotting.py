@@ -1,10 +1,10 @@
 import calendar
+import io
 from datetime import date, datetime, timedelta
 
 import numpy as np
-import pandas as pd
-import plotext
 
+from weather.helpers import forecast, instrument, solar
 from weather.helpers.configure import set_entry_size_manual
 
 
@@ -12,22 +12,41 @@ def normalize(series):
     return (series - np.min(series)) / (np.max(series) - min(series)) * 100
 
 
+def present(times):
+    """Drop missing (NaT) entries, such as sunrises on polar days and nights."""
+    return times[~np.isnat(times)]
+
+
 def my_step(yvals, label, idx):
+    import plotext
+
     if label == "precip":
-        yvals = [y[0] for y in yvals]
-    xvals = [idx[0]] + [np.mean([i, i + 1]) for i in idx[:-1] for x in range(2)] + [idx[-1]]
-    yvals = [y for y in yvals for x in range(2)]
-    plotext.plot(xvals, yvals, label=label)
+        yvals = yvals[:, 0]
+    xvals = np.concatenate([idx[:1], np.repeat(idx[:-1] + 0.5, 2), idx[-1:]])
+    yvals = np.repeat(forecast.fit(yvals, len(idx)), 2)
+    plotext.plot(xvals.tolist(), yvals.tolist(), label=label)
 
 
+@instrument.timed
 def plot_terminal(weather_dict, d):
     """Plot to terminal."""
+    import plotext
+
+    plotext.clf()
+    if "name" in weather_dict.keys():
+        plotext.title(weather_dict["name"])
 
     if d["n_days"] <= 2:
-        time_start = datetime.combine(date.today(), datetime.min.time())
-        time_end = datetime.combine(date.today() + timedelta(days=d["n_days"]), datetime.min.time())
-        time_range = [t.to_pydatetime() for t in pd.date_range(time_start, time_end, freq="H")]
-        idx = [i for i in range(len(time_range))]
+        valid_times = weather_dict["validTimeLocal"]
+        if d["d"]:
+            # -d shows whole days, back to midnight lookback days ago
+            lookback = d.get("lookback", 0)
+            time_start = np.datetime64(date.today(), "h") - lookback * 24 * forecast.one_hour
+            time_range = time_start + np.arange((d["n_days"] + lookback) * 24 + 1) * forecast.one_hour
+        else:
+            time_range = valid_times
+        idx = np.arange(len(time_range))
+        value_idx = forecast.hours_since(valid_times, time_range[0])
         for label, yvals in weather_dict.items():
             if label in [
                 "temperature",
@@ -36,21 +55,19 @@ def plot_terminal(weather_dict, d):
                 "cloudCover",
                 "windSpeed",
             ]:
-                my_step(yvals, label=label, idx=idx)
-        xticks = [datetime.strftime(x, "%I:%M") for x in time_range]
-        plotext.xticks(ticks=idx[::2], labels=xticks[::2])
-        for m in weather_dict["sunriseTimeLocal"]:
-            m = (m - time_range[0]).total_seconds() / 3600
+                my_step(yvals, label=label, idx=value_idx)
+        xticks = forecast.hour_labels(time_range)
+        plotext.xticks(ticks=idx[::2].tolist(), labels=xticks[::2].tolist())
+        for m in forecast.hours_since(present(weather_dict["sunriseTimeLocal"]), time_range[0]):
             plotext.vertical_line(m, color=226)
-        for m in weather_dict["sunsetTimeLocal"]:
-            m = (m - time_range[0]).total_seconds() / 3600
+        for m in forecast.hours_since(present(weather_dict["sunsetTimeLocal"]), time_range[0]):
             plotext.vertical_line(m, color=220)
-        timediff = (datetime.now() - time_range[0]).total_seconds() / 3600
+        timediff = forecast.hours_since(np.datetime64(datetime.now()), time_range[0])
         plotext.vertical_line(timediff, color=1)
     else:
         today = date.today()
         time_range = [calendar.day_name[(today + timedelta(days=i)).weekday()] for i in range(d["n_days"])]
-        idx = [i for i in range(len(time_range))]
+        idx = np.arange(len(time_range))
         for label, yvals in weather_dict.items():
             if label in [
                 "calendarDayTemperatureMax",
@@ -60,7 +77,7 @@ def plot_terminal(weather_dict, d):
                 "windSpeed",
             ]:
                 my_step(yvals, label=label, idx=idx)
-        plotext.xticks(ticks=idx, labels=time_range)
+        plotext.xticks(ticks=idx.tolist(), labels=time_range)
     plotext.xlim(0, np.max(idx))
     plotext.ylim(0, 100)
     plotext.yticks(range(0, 101, 10))
@@ -90,25 +107,45 @@ def define_marker(windDirection):
         return "$\u2B0A$"
 
 
-def plot_matplot(weather_dict, d):
-    """Plot to standard matplotlib output."""
-    import matplotlib.pyplot as plt
+# each wind direction category mapped to its glyph, and to the index of that glyph in wind_glyphs
+wind_glyphs = sorted(set(define_marker(w) for w in forecast.wind_directions))
+wind_glyph_codes = np.array([wind_glyphs.index(define_marker(w)) for w in forecast.wind_directions] + [-1])
 
-    plt.rcParams["figure.figsize"] = (20, 7)
-    plt.rcParams["font.family"] = "sans-serif"
-    plt.rcParams["font.serif"] = "Helvetica Neue"
-    plt.rcParams["font.size"] = 8
 
+def draw_wind(ax, x, speeds, codes, color):
+    """Draw wind speeds as arrows pointing downwind, with one scatter collection per arrow glyph."""
+    import matplotlib
+
+    n = min(len(x), len(codes))
+    groups = wind_glyph_codes[codes[:n]]
+    for group in np.unique(groups[groups >= 0]):
+        in_group = groups == group
+        ax.scatter(
+            x[:n][in_group],
+            speeds[:n][in_group],
+            color=color,
+            marker=wind_glyphs[group],
+            s=matplotlib.rcParams["lines.markersize"] ** 2,
+        )
+
+
+style = {
+    "figure.figsize": (20, 7),
+    "font.family": "sans-serif",
+    "font.serif": "Helvetica Neue",
+    "font.size": 8,
+}
+
+
+@instrument.timed
+def draw_forecast(ax, weather_dict, d):
+    """Draw an hourly or daily forecast onto a matplotlib Axes."""
     if d["n_days"] <= 2:
+        time_range = weather_dict["validTimeLocal"]
         if d["d"]:
-            time_start = datetime.combine(date.today(), datetime.min.time())
-            time_end = datetime.combine(date.today() + timedelta(days=d["n_days"]), datetime.min.time())
-            time_range = [t.to_pydatetime() for t in pd.date_range(time_start, time_end, freq="H")][:-1]
             # plot current time
-            timediff = (datetime.now() - time_range[0]).total_seconds() / 3600
-            plt.vlines(timediff, ymin=0, ymax=100, alpha=0.8, color="red")
-        else:
-            time_range = weather_dict["validTimeLocal"]
+            timediff = forecast.hours_since(np.datetime64(datetime.now()), time_range[0])
+            ax.vlines(timediff, ymin=0, ymax=100, alpha=0.8, color="red")
         plot_dicts = [
             {
                 "v": weather_dict["temperature"],
@@ -136,20 +173,20 @@ def plot_matplot(weather_dict, d):
                 "label": "Wind Speed (mph)",
             },
         ]
-        idx = [i for i in range(len(time_range))]
+        idx = np.arange(len(time_range))
         for plot_dict in plot_dicts:
-            plot_dict["v"] = plot_dict["v"] + [float("NaN")] * (len(idx) - len(plot_dict["v"]))
+            yvals = forecast.fit(plot_dict["v"], len(idx))
             if plot_dict["label"] != "Wind Speed (mph)":
-                plt.step(
+                ax.step(
                     idx,
-                    plot_dict["v"][: len(idx)],
+                    yvals,
                     alpha=0.8,
                     where="mid",
                     color=plot_dict["c"],
                     label=plot_dict["label"],
                 )
             else:
-                plt.plot(
+                ax.plot(
                     [],
                     [],
                     color=plot_dict["c"],
@@ -158,21 +195,15 @@ def plot_matplot(weather_dict, d):
                     markersize=5,
                     label="Wind Speed (mph)",
                 )
-                for i in idx[: len(weather_dict["windDirectionCardinal"])]:
-                    plt.plot(
-                        i,
-                        plot_dict["v"][i],
-                        color=plot_dict["c"],
-                        marker=define_marker(weather_dict["windDirectionCardinal"][i]),
-                    )
-        xticks = [datetime.strftime(x, "%I:%M") for x in time_range]
-        plt.xticks(
+                draw_wind(ax, idx, yvals, weather_dict["windDirectionCardinal"], plot_dict["c"])
+        xticks = forecast.hour_labels(time_range)
+        ax.set_xticks(
             ticks=idx[::2],
-            labels=[x if i % 2 == 0 else None for i, x in enumerate(xticks[::2])],
+            labels=[x if i % 2 == 0 else "" for i, x in enumerate(xticks[::2])],
         )
-        sunrise_diffs = [(m - time_range[0]).total_seconds() / 3600 for m in weather_dict["sunriseTimeLocal"]]
-        sunset_diffs = [(m - time_range[0]).total_seconds() / 3600 for m in weather_dict["sunsetTimeLocal"]]
-        plt.vlines(
+        sunrise_diffs = forecast.hours_since(present(weather_dict["sunriseTimeLocal"]), time_range[0])
+        sunset_diffs = forecast.hours_since(present(weather_dict["sunsetTimeLocal"]), time_range[0])
+        ax.vlines(
             sunrise_diffs,
             ymin=0,
             ymax=100,
@@ -180,7 +211,7 @@ def plot_matplot(weather_dict, d):
             linestyles=":",
             color="gold",
         )
-        plt.vlines(
+        ax.vlines(
             sunset_diffs,
             ymin=0,
             ymax=100,
@@ -188,30 +219,23 @@ def plot_matplot(weather_dict, d):
             linestyles=":",
             color="#FFC838",
         )
-        night_periods = (
-            [(sunrise_diffs[0] - 12, sunrise_diffs[0])]
-            + [(sunset_diffs[i], sunrise_diffs[i + 1]) for i in range(len(sunset_diffs) - 1)]
-            + [(sunset_diffs[-1], sunset_diffs[-1] + 12)]
-        )
-        for p in night_periods:
+        day_starts, day_ends = (forecast.hours_since(t, time_range[0]) for t in solar.daylight_periods(weather_dict))
+        night_starts = np.concatenate([[0], day_ends]).clip(0, len(time_range) - 1)
+        night_ends = np.concatenate([day_starts, [len(time_range) - 1]]).clip(0, len(time_range) - 1)
+        for start, end in zip(night_starts, night_ends):
             # add shading to nighttime
-            plt.axvspan(p[0], p[1], alpha=0.1, color="black")
+            if start < end:
+                ax.axvspan(start, end, alpha=0.1, color="black")
         if "water_level" in weather_dict.keys() and d["tide"]:
-            tides = {"rel_time": [], "water_level": []}
-            for i, t in enumerate(weather_dict["local_time"]):
-                if t >= time_range[0] and t <= time_range[-1]:
-                    rel_time = (t - time_range[0]).total_seconds() / 3600
-                    tides["rel_time"].append(rel_time)
-                    tides["water_level"].append(weather_dict["water_level"][i])
-            tides["water_level"] = normalize(tides["water_level"])
-            plt.plot(
-                tides["rel_time"],
-                tides["water_level"],
+            in_range = (weather_dict["local_time"] >= time_range[0]) & (weather_dict["local_time"] <= time_range[-1])
+            ax.plot(
+                forecast.hours_since(weather_dict["local_time"][in_range], time_range[0]),
+                normalize(weather_dict["water_level"][in_range]),
                 label="Water Level (Relative %)",
                 alpha=0.2,
             )
-        plt.title(f"Hourly Weather Forecast for {weather_dict['name']}")
-        plt.xlim(0, np.max(idx))
+        ax.set_title(f"Hourly Weather Forecast for {weather_dict['name']}")
+        ax.set_xlim(0, np.max(idx))
     else:
         today = date.today()
         time_range = [
@@ -235,21 +259,20 @@ def plot_matplot(weather_dict, d):
                 "label": "Wind Speed (mph)",
             },
         ]
-        idx = [i for i in range(len(time_range) + 1)]
+        idx = np.arange(len(time_range) + 1)
         for plot_dict in plot_dicts:
-            yvals = [v if v != "null" else float("NaN") for v in plot_dict["v"]]
-            yvals = yvals + [float("NaN")] * (len(idx) - len(yvals))
+            yvals = forecast.fit(plot_dict["v"], len(idx))
             if plot_dict["label"] != "Wind Speed (mph)":
-                plt.step(
-                    [i - 0.5 for i in idx],
-                    yvals[: len(idx)],
+                ax.step(
+                    idx - 0.5,
+                    yvals,
                     alpha=0.8,
                     where="post",
                     color=plot_dict["c"],
                     label=plot_dict["label"],
                 )
             else:
-                plt.plot(
+                ax.plot(
                     [],
                     [],
                     color=plot_dict["c"],
@@ -257,13 +280,7 @@ def plot_matplot(weather_dict, d):
                     linestyle="None",
                     label="Wind Speed (mph)",
                 )
-                for i in idx[: len(weather_dict["windDirectionCardinal"])]:
-                    plt.plot(
-                        i,
-                        yvals[i],
-                        color=plot_dict["c"],
-                        marker=define_marker(weather_dict["windDirectionCardinal"][i]),
-                    )
+                draw_wind(ax, idx, yvals, weather_dict["windDirectionCardinal"], plot_dict["c"])
         temperature_dicts = [
             {
                 "v": [
@@ -285,15 +302,12 @@ def plot_matplot(weather_dict, d):
             },
         ]
         for temp_dict in temperature_dicts:
-            yvals = [
-                [v if v != "null" else float("NaN") for v in l] + [float("NaN")] * (len(idx) - len(temp_dict["v"][0]))
-                for l in temp_dict["v"]
-            ]
+            yvals = [forecast.fit(v, len(idx)) for v in temp_dict["v"]]
             if temp_dict["label"] == "Temperature Range (°F)":
-                plt.fill_between(
-                    [i - 0.5 for i in idx],
-                    yvals[0][: len(idx)],
-                    yvals[1][: len(idx)],
+                ax.fill_between(
+                    idx - 0.5,
+                    yvals[0],
+                    yvals[1],
                     step="post",
                     alpha=temp_dict["alpha"],
                     color=temp_dict["c"],
@@ -301,8 +315,8 @@ def plot_matplot(weather_dict, d):
                 )
             else:
                 for i in range(2):
-                    plt.step(
-                        [i - 0.5 for i in idx],
+                    ax.step(
+                        idx - 0.5,
                         yvals[i],
                         where="post",
                         linestyle="--",
@@ -310,14 +324,73 @@ def plot_matplot(weather_dict, d):
                         alpha=0.3,
                         color="black",
                     )
-        labels = [w if w != "null" else "" for w in weather_dict["wxPhraseLong"]]
+        labels = weather_dict["wxPhraseLong"]
         for i in idx[:-1][: len(labels)]:
-            plt.text(i, 101, labels[i], ha="center")
-        plt.xticks(ticks=idx[:-1], labels=time_range)
-        plt.title(f"Daily Weather Forecast for {weather_dict['name']}\n")
-        plt.xlim(0 - 0.5, np.max(idx) - 0.5)
-    plt.ylim(0, 100)
-    plt.yticks(range(0, 101, 10))
-    plt.grid(True)
-    plt.legend(loc="upper right")
+            ax.text(i, 101, labels[i], ha="center")
+        ax.set_xticks(ticks=idx[:-1], labels=time_range)
+        ax.set_title(f"Daily Weather Forecast for {weather_dict['name']}\n")
+        ax.set_xlim(0 - 0.5, np.max(idx) - 0.5)
+    ax.set_ylim(0, 100)
+    ax.set_yticks(range(0, 101, 10))
+    ax.grid(True)
+    ax.legend(loc="upper right")
+
+
+def plot_matplot(weather_dict, d):
+    """Plot to standard matplotlib output."""
+    import matplotlib.pyplot as plt
+
+    plt.rcParams.update(style)
+    _, ax = plt.subplots()
+    draw_forecast(ax, weather_dict, d)
     plt.show()
+
+
+def grid_shape(n):
+    ncols = min(n, 2)
+    return -(-n // ncols), ncols
+
+
+def plot_matplot_grid(weather_dicts, d):
+    """Plot several locations' forecasts as a grid of subplots in one window."""
+    import matplotlib.pyplot as plt
+
+    plt.rcParams.update(style)
+    nrows, ncols = grid_shape(len(weather_dicts))
+    width, height = plt.rcParams["figure.figsize"]
+    fig, axes = plt.subplots(nrows, ncols, figsize=(width, height * nrows / ncols), squeeze=False)
+    for ax, weather_dict in zip(axes.flat, weather_dicts):
+        draw_forecast(ax, weather_dict, d)
+    for ax in axes.flat[len(weather_dicts) :]:
+        ax.set_visible(False)
+    fig.tight_layout()
+    plt.show()
+
+
+@instrument.timed
+def render_images(weather_dicts, d, fmt="png", paths=None, dpi=100):
+    """Render forecasts headlessly with the Agg backend, one image per location.
+
+    A single figure and axes are reused for every location. Images are written to paths when given
+    (and the paths returned); otherwise the encoded image bytes are returned.
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    outputs = []
+    with matplotlib.rc_context(style):
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        for i, weather_dict in enumerate(weather_dicts):
+            ax.clear()
+            draw_forecast(ax, weather_dict, d)
+            if paths is not None:
+                fig.savefig(paths[i], format=fmt, dpi=dpi)
+                outputs.append(paths[i])
+            else:
+                buffer = io.BytesIO()
+                fig.savefig(buffer, format=fmt, dpi=dpi)
+                outputs.append(buffer.getvalue())
+    return outputs
@@ -0,0 +1,97 @@
+import csv
+import json
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+
+from weather.helpers import fetch, scrape, tides
+from weather.helpers.configure import load_config, resolve_timezone, update_config
+
+# bound on simultaneous validation requests during a bulk import
+max_workers = 8
+
+
+def validate_station(station_id, station=None):
+    """Check that NOAA serves MLLW predictions for station_id; raises ValueError if not."""
+    try:
+        tides.download_predictions(
+            station_id, date.today() - timedelta(days=1), date.today() + timedelta(days=1), station=station
+        )
+    except Exception as e:
+        raise ValueError(f"No valid datum value for MLLW ***station={station_id}") from e
+
+
+def location_entry(url, tide_station=None, station=None):
+    """Validate a weather.com URL (and optional NOAA station) and return its config entry, without a timezone."""
+    weather_hash = Path(url.strip()).stem
+    try:
+        page_text = fetch.download_page("hourly", weather_hash).text
+    except Exception as e:
+        raise ValueError(f"Could not download {url}: {e}") from e
+    loc_config = {"weather_hash": weather_hash, **scrape.parse_location(page_text)}
+    if tide_station not in (None, ""):
+        validate_station(int(tide_station), station)
+        loc_config["tide_station"] = int(tide_station)
+    return loc_config
+
+
+def read_entries(path):
+    """Read import entries from a CSV (alias,url[,tide_station] columns) or JSON file.
+
+    JSON may be a list of {"alias", "url", "tide_station"} objects or a mapping of alias to {"url", "tide_station"}.
+    """
+    with open(path, "r", newline="") as f:
+        if str(path).endswith(".json"):
+            entries = json.load(f)
+            if isinstance(entries, dict):
+                entries = [{"alias": alias, **entry} for alias, entry in entries.items()]
+        else:
+            entries = list(csv.DictReader(f))
+    return [
+        {"alias": entry["alias"].strip().upper(), "url": entry.get("url"), "tide_station": entry.get("tide_station")}
+        for entry in entries
+    ]
+
+
+def provision(entries, workers=None, station=None):
+    """Validate entries concurrently and add the valid ones to config in a single atomic write.
+
+    Aliases already in config are left untouched, and an alias given more than once is skipped, since it is
+    ambiguous which entry was meant. Returns ({alias: loc_config} added, {alias: reason} skipped).
+    """
+    existing = load_config()
+    counts = Counter(entry["alias"] for entry in entries)
+    added = {}
+    failed = {}
+    for entry in entries:
+        if entry["alias"] in existing:
+            failed[entry["alias"]] = "Alias already exists in config."
+        elif counts[entry["alias"]] > 1:
+            failed[entry["alias"]] = f"Alias appears {counts[entry['alias']]} times in the import file."
+        elif not entry["url"]:
+            failed[entry["alias"]] = "No url given."
+    with ThreadPoolExecutor(max_workers=workers or max_workers) as executor:
+        futures = {
+            entry["alias"]: executor.submit(location_entry, entry["url"], entry.get("tide_station"), station)
+            for entry in entries
+            if entry["alias"] not in failed
+        }
+        for alias, future in futures.items():
+            try:
+                added[alias] = future.result()
+            except ValueError as e:
+                failed[alias] = str(e)
+    # timezone lookups share one TimezoneFinder, so they run here rather than on the workers
+    for loc_config in added.values():
+        loc_config["timezone"] = resolve_timezone(loc_config["lat_lon"])
+
+    def merge(config):
+        for alias in list(added):
+            if alias in config:
+                failed[alias] = "Alias already exists in config."
+                del added[alias]
+        return {**config, **added}
+
+    update_config(merge)
+    return added, failed
@@ -0,0 +1,169 @@
+import random
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlsplit
+
+import requests
+
+from weather.helpers import instrument
+
+# per-host limits: simultaneous requests, sustained requests per second, and burst size. Hosts not listed
+# (such as local stubs) are not limited, though their requests are still deduplicated and retried.
+host_limits = {
+    "weather.com": {"concurrency": 8, "rate": 10.0, "burst": 20},
+    "api.tidesandcurrents.noaa.gov": {"concurrency": 4, "rate": 5.0, "burst": 10},
+}
+default_limits = {"concurrency": None, "rate": None, "burst": None}
+
+# throttling and transient server errors are retried with jittered exponential backoff
+retry_statuses = {429, 500, 502, 503, 504}
+retry_errors = (requests.ConnectionError, requests.Timeout)
+max_retries = 3
+backoff = 0.5
+max_backoff = 30.0
+
+_lock = threading.Lock()
+_hosts = {}
+_in_flight = {}
+
+
+def host_state(host):
+    with _lock:
+        if host not in _hosts:
+            limits = {**default_limits, **host_limits.get(host, {})}
+            _hosts[host] = {
+                "limits": limits,
+                "slots": threading.Semaphore(limits["concurrency"] or sys.maxsize),
+                "tokens": limits["burst"],
+                "refilled": time.monotonic(),
+                "queued": 0,
+                "active": 0,
+                "requests": 0,
+                "coalesced": 0,
+                "retries": 0,
+                "errors": 0,
+                "latency": 0.0,
+                "max_latency": 0.0,
+            }
+        return _hosts[host]
+
+
+def take_token(state):
+    """Block until the host's token bucket allows another request."""
+    rate, burst = state["limits"]["rate"], state["limits"]["burst"]
+    if rate is None:
+        return
+    while True:
+        with _lock:
+            now = time.monotonic()
+            state["tokens"] = min(burst, state["tokens"] + (now - state["refilled"]) * rate)
+            state["refilled"] = now
+            if state["tokens"] >= 1:
+                state["tokens"] -= 1
+                return
+            wait = (1 - state["tokens"]) / rate
+        time.sleep(wait)
+
+
+def retry_delay(attempt, response=None):
+    """Seconds to wait before retrying: the server's Retry-After if it gave one, else jittered exponential backoff."""
+    retry_after = response.headers.get("Retry-After", "") if response is not None else ""
+    if retry_after.isdigit():
+        return min(float(retry_after), max_backoff)
+    return min(backoff * 2**attempt, max_backoff) * random.uniform(0.5, 1.5)
+
+
+def attempt(host, fn):
+    """Call fn under the host's concurrency and rate limits, retrying throttled or failed requests."""
+    state = host_state(host)
+    for i in range(max_retries + 1):
+        with _lock:
+            state["queued"] += 1
+        state["slots"].acquire()
+        try:
+            take_token(state)
+            with _lock:
+                state["queued"] -= 1
+                state["active"] += 1
+            start = time.perf_counter()
+            try:
+                response, error = fn(), None
+            except retry_errors as e:
+                response, error = None, e
+            finally:
+                elapsed = time.perf_counter() - start
+                with _lock:
+                    state["active"] -= 1
+                    state["requests"] += 1
+                    state["latency"] += elapsed
+                    state["max_latency"] = max(state["max_latency"], elapsed)
+        finally:
+            state["slots"].release()
+        failed = error is not None or getattr(response, "status_code", None) in retry_statuses
+        with _lock:
+            state["errors"] += failed
+            state["retries"] += failed and i < max_retries
+        if not failed:
+            return response
+        if i == max_retries:
+            if error is not None:
+                raise error
+            return response
+        time.sleep(retry_delay(i, response))
+
+
+def run(host, key, fn):
+    """Run fn, one upstream request to host, under that host's limits.
+
+    Callers asking for the same key while a request is in flight wait for it and share its result.
+    """
+    state = host_state(host)
+    with _lock:
+        future = _in_flight.get(key)
+        leader = future is None
+        if leader:
+            future = _in_flight[key] = Future()
+    if not leader:
+        with _lock:
+            state["coalesced"] += 1
+        return future.result()
+    try:
+        future.set_result(attempt(host, fn))
+    except BaseException as e:
+        future.set_exception(e)
+    finally:
+        with _lock:
+            del _in_flight[key]
+    return future.result()
+
+
+def get(url, session, headers=None, timeout=30):
+    """GET url through the scheduler; concurrent GETs of the same url and headers share one response."""
+    key = ("GET", url, tuple(sorted((headers or {}).items())))
+
+    def request():
+        response = session.get(url, headers=headers, timeout=timeout)
+        instrument.count("bytes_downloaded", len(response.content))
+        return response
+
+    return run(urlsplit(url).hostname, key, request)
+
+
+def counters():
+    """Snapshot of per-host queue depth, in-flight requests, retries and request latency (ms)."""
+    with _lock:
+        return {
+            host: {
+                "queued": state["queued"],
+                "active": state["active"],
+                "requests": state["requests"],
+                "coalesced": state["coalesced"],
+                "retries": state["retries"],
+                "errors": state["errors"],
+                "mean_latency_ms": 1000 * state["latency"] / state["requests"] if state["requests"] else 0.0,
+                "max_latency_ms": 1000 * state["max_latency"],
+            }
+            for host, state in _hosts.items()
+        }
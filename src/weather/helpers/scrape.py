@@ -1,11 +1,12 @@
 import calendar
+import hashlib
+import json
 import re
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 
-import noaa_coops as nc
-import pandas as pd
-import requests
-import timezonefinder
+import numpy as np
+
+from weather.helpers import forecast, instrument
 
 hour_attrs = [
     "validTimeLocal",
@@ -29,6 +30,18 @@ day_attrs = [
     "wxPhraseLong",
 ]
 
+section_headers = [
+    "getSunV3HourlyForecastWithHeadersUrlConfig",
+    "getSunV3HistoricalOneDayHourlyConditionsUrlConfig",
+    "getSunV3DailyForecastWithHeadersUrlConfig",
+    "getSunV3DailyAlmanacUrlConfig",
+    "getSunV3CurrentObservationsUrlConfig",
+]
+
+# page state is embedded as an escaped string literal, so section keys appear as \"getSunV3...UrlConfig\":
+section_pattern = re.compile(r'UrlConfig\\":')
+decoder = json.JSONDecoder()
+
 
 def clean_hour(hour_str):
     return hour_str.replace(" ", ":00 ").upper()
@@ -41,187 +54,161 @@ def pad(s, l=8):
         return s
 
 
-def get_weather_hourly(soup):
-    # get loc where time in list and append all values to obs
-    start_loc = re.search(r"{}".format("getSunV3HourlyForecastWithHeadersUrlConfig"), soup).end(0)
-    search_str = soup[start_loc : start_loc + 15000]
-    weather_dict = {k: None for k in hour_attrs}
-    for a in hour_attrs:
-        match = re.search(r'"{}\\":\[(.*?)\],'.format(a), search_str)
-        if match:
-            obs_list = [x.strip('"\\') for x in match.group(1).split(",")]
-            if a not in [
-                "validTimeLocal",
-                "precipType",
-                "windDirectionCardinal",
-            ]:
-                obs_list = [float(x) for x in obs_list]
-            weather_dict[a] = obs_list
-    weather_dict["validTimeLocal"] = [
-        datetime.strptime(x[:19], "%Y-%m-%dT%H:%M:%S") for x in weather_dict["validTimeLocal"]
-    ]
-
-    return weather_dict
-
-
-def get_weather_hourly_h(soup):
-    time_start = datetime.combine(date.today(), datetime.min.time())
-    time_end = datetime.combine(date.today() + timedelta(days=2), datetime.min.time())
-
-    time_range = pd.date_range(time_start, time_end, freq="H")
-
-    past_times = [t.to_pydatetime() for t in time_range if t < datetime.now()]
-    forecast_times = [t.to_pydatetime() for t in time_range if t > datetime.now()]
-    historical_obs = process_by_time_hourly(soup, "getSunV3HistoricalOneDayHourlyConditionsUrlConfig", past_times)
-    forecast_obs = process_by_time_hourly(soup, "getSunV3HourlyForecastWithHeadersUrlConfig", forecast_times)
-
-    weather_dict = {k: [] for k in hour_attrs}
-    for k in weather_dict.keys():
-        for obs_dict in [historical_obs, forecast_obs]:
-            if k in obs_dict.keys() and obs_dict[k] is not None:
-                weather_dict[k] += obs_dict[k]
-            else:
-                weather_dict[k] += [None for i in range(len(obs_dict["validTimeLocal"]))]
-
-    return weather_dict
-
-
-def get_weather_daily(soup):
-    start_loc = re.search(r"getSunV3DailyForecastWithHeadersUrlConfig", soup).end(0)
-    search_str = soup[start_loc : start_loc + 30000]
-    days = [x.strip('"\\') for x in re.findall(r'"dayOfWeek\\":\[(.*?)\],', search_str)[0].split(",")]
-    start_idx = days.index(calendar.day_name[date.today().weekday()])
-    obs = {k: None for k in day_attrs}
+@instrument.timed
+def parse_sections(page, headers=None, memo=None):
+    """Locate every *UrlConfig section of the embedded page state in one pass and decode the requested ones.
+
+    Returns {header: [data, ...]} with one data dict per request parameter set found for that section.
+    If memo is given it maps content hashes of raw section chunks to their decoded entries: unchanged
+    sections are served from it instead of being decoded again, and entries no longer on the page are dropped.
+    """
+    headers = section_headers if headers is None else headers
+    sections = {}
+    seen = set()
+    matches = list(section_pattern.finditer(page))
+    for i, match in enumerate(matches):
+        header = page[page.rfind('\\"', 0, match.start()) + 2 : match.start()] + "UrlConfig"
+        if header not in headers:
+            continue
+        # a section runs until the next section key; the escaped chunk is unescaped and decoded on its own
+        end = matches[i + 1].start() if i + 1 < len(matches) else page.find('")', match.end())
+        chunk = page[match.end() : end]
+        if memo is None:
+            entries = decode_section(chunk)
+        else:
+            digest = hashlib.sha1(chunk.encode()).digest()
+            seen.add(digest)
+            if digest not in memo:
+                memo[digest] = decode_section(chunk)
+            entries = memo[digest]
+        if entries:
+            sections.setdefault(header, []).extend(entries)
+    if memo is not None:
+        for digest in memo.keys() - seen:
+            del memo[digest]
+    return sections
+
+
+def decode_section(chunk):
+    """Decode one escaped section chunk into the list of its non-empty data dicts."""
+    entries, _ = decoder.raw_decode(json.loads('"' + chunk + '"'))
+    if not isinstance(entries, dict):
+        return []
+    return [e["data"] for e in entries.values() if isinstance(e, dict) and e.get("data")]
+
+
+@instrument.timed
+def merge_sections(page_sections):
+    """Merge per-page parse_sections results, keeping entries in page order."""
+    sections = {}
+    for page_section in page_sections:
+        for header, entries in page_section.items():
+            sections.setdefault(header, []).extend(entries)
+    return sections
+
+
+def series_length(data):
+    return max((len(v) for v in data.values() if isinstance(v, list)), default=0)
+
+
+def get_section(sections, header):
+    # a section may be requested with several durations; the longest series covers the others
+    entries = sections.get(header)
+    if not entries:
+        raise ValueError(f"Section {header} not found in page data.")
+    return max(entries, key=series_length)
+
+
+def columns(data, attrs, n=None):
+    """Convert the attrs of a section's data into columnar arrays, filling absent attrs with missing values."""
+    n = series_length(data) if n is None else n
+    return {a: forecast.convert(data[a], a) if data.get(a) is not None else forecast.empty(a, n) for a in attrs}
+
+
+@instrument.timed
+def get_weather_hourly(sections):
+    data = get_section(sections, "getSunV3HourlyForecastWithHeadersUrlConfig")
+    return columns(data, hour_attrs)
+
+
+@instrument.timed
+def get_weather_hourly_h(sections):
+    time_start = np.datetime64(date.today(), "h")
+    time_range = time_start + np.arange(2 * 24 + 1) * forecast.one_hour
+    now = np.datetime64(datetime.now())
+
+    # observed history up to now, forecasts after it, joined onto the hourly grid in one pass
+    historical_obs = columns(get_section(sections, "getSunV3HistoricalOneDayHourlyConditionsUrlConfig"), hour_attrs)
+    forecast_obs = columns(get_section(sections, "getSunV3HourlyForecastWithHeadersUrlConfig"), hour_attrs)
+    past = historical_obs["validTimeLocal"] < now
+    future = forecast_obs["validTimeLocal"] > now
+    merged_obs = {k: np.concatenate([historical_obs[k][past], forecast_obs[k][future]]) for k in hour_attrs}
+
+    return forecast.align(time_range, merged_obs)
+
+
+@instrument.timed
+def get_weather_daily(sections):
+    data = get_section(sections, "getSunV3DailyForecastWithHeadersUrlConfig")
+    daypart = data["daypart"][0]
+    start_idx = data["dayOfWeek"].index(calendar.day_name[date.today().weekday()])
+    n_days = len(data["dayOfWeek"])
+    obs = {}
     for a in day_attrs:
-        match = re.findall(r'"{}\\":\[(.*?)\],'.format(a), search_str)
-        if match:
-            obs_list = [x.strip('"\\') for x in match[1].split(",")][start_idx:]
-            if a not in ["precipType", "windDirectionCardinal", "wxPhraseLong"]:
-                obs_list = [float(x) if x != "null" else x for x in obs_list]
-            if a not in [
-                "calendarDayTemperatureMax",
-                "calendarDayTemperatureMin",
-            ]:
-                obs_list = obs_list[::2]
-            obs[a] = obs_list
-    return obs
-
-
-def process_by_time_hourly(soup, header, times):
-    # get loc where time in list and append all values to obs
-    start_loc = re.search(r"{}".format(header), soup).end(0)
-    search_str = soup[start_loc : start_loc + 15000]
-    unordered_obs = {k: None for k in hour_attrs}
-    for a in hour_attrs:
-        match = re.search(r'"{}\\":\[(.*?)\],'.format(a), search_str)
-        if match:
-            list_str = match.group(1)
-            unordered_obs[a] = (
-                [x.strip('"\\') for x in list_str.split(",")]
-                if a in ["validTimeLocal", "precipType", "windDirectionCardinal"]
-                else [float(x) for x in list_str.split(",")]
-            )
-    unordered_obs["validTimeLocal"] = [
-        datetime.strptime(x[:19], "%Y-%m-%dT%H:%M:%S") for x in unordered_obs["validTimeLocal"]
-    ]
-
-    ordered_obs = {k: [] for k in hour_attrs if unordered_obs[k] is not None}
-    for t in times:
-        if t in unordered_obs["validTimeLocal"]:
-            idx = unordered_obs["validTimeLocal"].index(t)
-            for a in ordered_obs.keys():
-                ordered_obs[a].append(unordered_obs[a][idx])
-
-    return ordered_obs
-
-
-def process_current_weather(soup, header):
-    # get loc where time in list and append all values to obs
-    start_loc = re.search(r"{}".format(header), soup).end(0)
-    search_str = soup[start_loc : start_loc + 15000]
-    obs = {k: None for k in hour_attrs}
-    for a in hour_attrs:
-        match = re.search(r'"{}\\":(.*?),'.format(a), search_str)
-        if match:
-            match_str = match.group(1)
-            obs[a] = [match_str.strip('"\\')] if a in ["validTimeLocal", "precipType"] else [float(match_str)]
-    obs["validTimeLocal"] = [datetime.strptime(obs["validTimeLocal"][0][:19], "%Y-%m-%dT%H:%M:%S")]
-
+        values = data.get(a, daypart.get(a))
+        if a == "wxPhraseLong":
+            column = forecast.to_labels(values if values is not None else [""] * 2 * n_days)
+        elif a in ["calendarDayTemperatureMax", "calendarDayTemperatureMin"]:
+            column = forecast.convert(values, a) if values is not None else forecast.empty(a, n_days)
+        else:
+            column = forecast.convert(values, a) if values is not None else forecast.empty(a, 2 * n_days)
+        column = column[start_idx:]
+        if a not in [
+            "calendarDayTemperatureMax",
+            "calendarDayTemperatureMin",
+        ]:
+            # day parts alternate day/night; keep the daytime entries
+            column = column[::2]
+        obs[a] = column
     return obs
 
 
-def get_sun(soup, d):
+@instrument.timed
+def get_historical_temperatures(sections, d):
+    today = np.datetime64(date.today(), "D")
+    data = get_section(sections, "getSunV3DailyAlmanacUrlConfig")
 
-    # get loc where time in list and append all values to obs
-    start_loc = re.search(r"getSunV3DailyForecastWithHeadersUrlConfig", soup).end(0)
-    search_str = soup[start_loc : start_loc + 15000]
-    attrs = ["sunriseTimeLocal", "sunsetTimeLocal"]
-    sun_dict = {k: None for k in attrs}
-    for a in attrs:
-        match = re.search(r'"{}\\":\[(.*?)\],'.format(a), search_str)
-        list_str = match.group(1)
-        sun_dict[a] = [datetime.strptime(x.strip('"\\')[:19], "%Y-%m-%dT%H:%M:%S") for x in list_str.split(",")][:3]
+    # almanac dates are MMDD strings for the current year
+    month_day = np.asarray(data["almanacRecordDate"], dtype=int)
+    record_dates = (
+        np.datetime64(str(date.today().year), "M") + (month_day // 100 - 1).astype("timedelta64[M]")
+    ).astype("datetime64[D]") + (month_day % 100 - 1).astype("timedelta64[D]")
+    keep = (record_dates >= today) & (record_dates < today + d["n_days"])
 
-    return sun_dict
-
-
-def get_historical_temperatures(soup, d):
-    dates = [date.today() + timedelta(days=i) for i in range(d["n_days"])]
-    temp_dict = {}
-    start_loc = re.search(r"getSunV3DailyAlmanacUrlConfig", soup).end(0)
-    search_str = soup[start_loc : start_loc + 10000]
+    temp_dict = {"almanacRecordDate": record_dates[keep]}
     for temp_obs in [
-        "almanacRecordDate",
         "temperatureAverageMin",
         "temperatureAverageMax",
         "temperatureRecordMax",
         "temperatureRecordMin",
     ]:
-        value_str = re.search(r'"{}\\":\[(.*?)\]'.format(temp_obs), search_str).group(1)
-        if temp_obs == "almanacRecordDate":
-            temp_dict[temp_obs] = [
-                datetime.strptime(x.strip('"\\') + str(date.today().year), "%m%d%Y").date()
-                for x in value_str.split(",")
-            ]
-        else:
-            temp_dict[temp_obs] = [float(x) if x != "null" else float("NaN") for x in value_str.split(",")]
-
-    out_dict = {k: [] for k in temp_dict.keys()}
-    for idx in range(len(temp_dict["almanacRecordDate"])):
-        if temp_dict["almanacRecordDate"][idx] in dates:
-            for k in temp_dict.keys():
-                out_dict[k].append(temp_dict[k][idx])
-
-    return out_dict
+        temp_dict[temp_obs] = forecast.to_values(data[temp_obs])[keep]
 
+    return temp_dict
 
-def get_tides(loc_config, d):
-    station = nc.Station(loc_config["tide_station"])
-    tf = timezonefinder.TimezoneFinder()
 
-    # try:
-    tides = station.get_data(
-        begin_date=(date.today() - timedelta(days=1)).strftime("%Y%m%d"),
-        end_date=(date.today() + timedelta(days=d["n_days"] + 1)).strftime("%Y%m%d"),
-        product="predictions",
-        datum="MLLW",
-        units="metric",
-        time_zone="gmt",
-    ).reset_index()
-    # except:
-    #    warnings.warn(f"No valid datum value for MLLW ***station={tide_station}")
-    #    return {}
-
-    home_timezone_str = tf.certain_timezone_at(lat=loc_config["lat_lon"][0], lng=loc_config["lat_lon"][1])
-    tides["date_time"] = tides["date_time"].dt.tz_localize("GMT").dt.tz_convert(home_timezone_str).dt.tz_localize(None)
-
-    tide_dict = {
-        "local_time": [x.to_pydatetime() for x in tides["date_time"]],
-        "water_level": tides["predicted_wl"].to_list(),
-    }
-
-    return tide_dict
+@instrument.timed
+def parse_location(page_text):
+    """Extract the lat_lon and display name of a weather.com location page; raises ValueError if they're missing."""
+    # latitude and longitude are found by regex to ensure we've found a page
+    coords = re.search(r'"latitude\\":(.*?),\\"longitude\\":(.*?),', page_text)
+    name = re.search(r"Hourly Weather Forecast for(.*?)- The Weather Channel", page_text)
+    if coords is None or name is None:
+        raise ValueError("Not a weather.com location page.")
+    return {"lat_lon": (float(coords.group(1)), float(coords.group(2))), "name": name.group(1).strip()}
 
 
 def Soup(url):
+    import requests
+
     print(requests.get(url))
@@ -0,0 +1,131 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from weather.helpers import forecast, pipeline, scheduler
+from weather.helpers.configure import load_config
+
+# bound on simultaneous pipeline runs; each run fans its downloads out on its own pipeline pool
+max_workers = 8
+
+
+def query_d(d, query):
+    """The run options for one request: d with n_days (and -d) overridden from the query string."""
+    params = {k: v[-1] for k, v in parse_qs(query).items()}
+    try:
+        n_days = int(params.get("n_days", d["n_days"]))
+    except ValueError:
+        raise ValueError("n_days must be an integer.")
+    if not 1 <= n_days <= 15:
+        raise ValueError("n_days must be between 1 and 15.")
+    return {**d, "n_days": n_days, "d": params.get("d", "1" if d["d"] else "0") not in ("0", "false", "")}
+
+
+def forecast_json(loc_config, d, memo):
+    return forecast.to_json(pipeline.get_forecasts([loc_config], d, memo=memo)[0])
+
+
+def tides_json(loc_config, d, memo):
+    return forecast.to_json(pipeline.get_tides(loc_config, d, memo))
+
+
+routes = {"forecast": forecast_json, "tides": tides_json}
+
+
+def make_app(d):
+    """Return an asyncio connection handler serving /forecast/{alias}, /tides/{alias} and /stats as JSON.
+
+    All clients share one memo of parsed pages and tide predictions (and the process-wide cache and session),
+    and concurrent identical requests are coalesced onto a single pipeline run.
+    """
+    memo, in_flight = {}, {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    async def run(route, alias, loc_config, run_d):
+        key = (route, alias, run_d["n_days"], run_d["d"])
+        if key not in in_flight:
+            job = asyncio.get_running_loop().run_in_executor(executor, routes[route], loc_config, run_d, memo)
+            in_flight[key] = job
+            job.add_done_callback(lambda _: in_flight.pop(key, None))
+        return await asyncio.shield(in_flight[key])
+
+    async def respond(target):
+        url = urlsplit(target)
+        parts = url.path.strip("/").split("/")
+        if parts == ["stats"]:
+            return HTTPStatus.OK, scheduler.counters()
+        if len(parts) != 2 or parts[0] not in routes:
+            return HTTPStatus.NOT_FOUND, {"error": "Use /forecast/{alias}?n_days=N, /tides/{alias}?n_days=N or /stats."}
+        alias = parts[1].upper()
+        loc_config = load_config().get(alias)
+        if loc_config is None:
+            return HTTPStatus.NOT_FOUND, {"error": f"Unknown alias {alias}."}
+        if parts[0] == "tides" and "tide_station" not in loc_config:
+            return HTTPStatus.NOT_FOUND, {"error": f"No tide station is set for {alias}. Use -add_tides to set one."}
+        try:
+            run_d = query_d(d, url.query)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        try:
+            return HTTPStatus.OK, await run(parts[0], alias, loc_config, run_d)
+        except Exception as e:
+            return HTTPStatus.BAD_GATEWAY, {"error": f"Could not build the {parts[0]} for {alias}: {e}"}
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    method, target, version = "", "", "HTTP/1.0"
+                if method != "GET":
+                    status, payload = HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Only GET requests are supported."}
+                else:
+                    status, payload = await respond(target)
+                # request bodies are never read, so only GETs can leave the connection in a usable state
+                keep_alive = (
+                    method == "GET" and version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                )
+                body = json.dumps(payload, separators=(",", ":")).encode()
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def start_server(d, host="127.0.0.1", port=8000):
+    return await asyncio.start_server(make_app(d), host, port)
+
+
+def serve(d, host="127.0.0.1", port=8000):
+    """Serve forecasts for the saved locations until interrupted."""
+
+    async def main():
+        server = await start_server(d, host, port)
+        print(f"\tServing forecasts on http://{host}:{server.sockets[0].getsockname()[1]}. Press Ctrl+C to exit.")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("")
@@ -0,0 +1,91 @@
+import numpy as np
+
+from weather.helpers import forecast, instrument
+from weather.helpers.configure import location_timezone
+
+# solar zenith at sunrise and sunset, allowing for refraction and the sun's radius
+zenith = 90.833
+
+
+def sun_times(lat, lon, dates):
+    """Sunrise, sunset and solar noon in UTC minutes after midnight, and hours of daylight, for datetime64[D] dates.
+
+    Uses NOAA's solar position equations evaluated at solar noon; days without a sunrise or sunset
+    (polar day or night) have NaN for both, and 24 or 0 hours of daylight.
+    """
+    # julian centuries since J2000.0 at roughly local solar noon
+    days = (dates - np.datetime64("2000-01-01")).astype(float) - lon / 360
+    t = days / 36525
+
+    mean_long = np.radians((280.46646 + t * (36000.76983 + t * 0.0003032)) % 360)
+    mean_anomaly = np.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = np.radians(
+        np.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t))
+        + np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * t)
+        + np.sin(3 * mean_anomaly) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * t)
+    apparent_long = mean_long + center - np.radians(0.00569 + 0.00478 * np.sin(omega))
+    mean_obliquity = 23 + (26 + (21.448 - t * (46.815 + t * (0.00059 - t * 0.001813))) / 60) / 60
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_long))
+
+    y = np.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * np.degrees(
+        y * np.sin(2 * mean_long)
+        - 2 * eccentricity * np.sin(mean_anomaly)
+        + 4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * mean_long)
+        - 0.5 * y**2 * np.sin(4 * mean_long)
+        - 1.25 * eccentricity**2 * np.sin(2 * mean_anomaly)
+    )
+
+    lat = np.radians(lat)
+    cos_hour_angle = np.cos(np.radians(zenith)) / (np.cos(lat) * np.cos(declination)) - np.tan(lat) * np.tan(
+        declination
+    )
+    hour_angle = np.degrees(np.arccos(np.clip(cos_hour_angle, -1, 1)))
+    no_event = np.abs(cos_hour_angle) > 1
+    solar_noon = 720 - 4 * lon - equation_of_time
+    sunrise = np.where(no_event, np.nan, solar_noon - 4 * hour_angle)
+    sunset = np.where(no_event, np.nan, solar_noon + 4 * hour_angle)
+    return sunrise, sunset, solar_noon, hour_angle / 7.5
+
+
+@instrument.timed
+def get_sun(loc_config, start, n_days):
+    """Local sun times for n_days dates from start, as arrays with one entry per day.
+
+    sunriseTimeLocal and sunsetTimeLocal are NaT together on polar days and nights, which daylightHours
+    (24 or 0) tells apart; solarNoonTimeLocal is always set.
+    """
+    dates = np.datetime64(start, "D") + np.arange(n_days)
+    lat, lon = loc_config["lat_lon"]
+    offsets = forecast.utc_offsets(
+        (dates + np.timedelta64(12, "h")).astype(forecast.time_dtype), location_timezone(loc_config)
+    )
+    sunrise, sunset, solar_noon, daylight = sun_times(lat, lon, dates)
+    sun_dict = {"daylightHours": daylight.astype(forecast.value_dtype)}
+    for attr, minutes in zip(
+        ["sunriseTimeLocal", "sunsetTimeLocal", "solarNoonTimeLocal"], [sunrise, sunset, solar_noon]
+    ):
+        times = forecast.empty(attr, n_days)
+        known = ~np.isnan(minutes)
+        times[known] = (
+            dates[known].astype(forecast.time_dtype)
+            + np.round(minutes[known]).astype("timedelta64[m]")
+            + offsets[known]
+        )
+        sun_dict[attr] = times
+    return sun_dict
+
+
+def daylight_periods(sun_dict):
+    """Local (start, end) of each day's daylight: sunrise to sunset, all day on polar days, none on polar nights."""
+    sunrise, sunset = sun_dict["sunriseTimeLocal"], sun_dict["sunsetTimeLocal"]
+    days = sun_dict["solarNoonTimeLocal"].astype("datetime64[D]").astype(forecast.time_dtype)
+    polar_day = np.isnat(sunrise) & (sun_dict["daylightHours"] > 12)
+    polar_night = np.isnat(sunrise) & ~polar_day
+    starts = np.where(polar_day, days, sunrise)[~polar_night]
+    ends = np.where(polar_day, days + np.timedelta64(1, "D"), sunset)[~polar_night]
+    return starts, ends
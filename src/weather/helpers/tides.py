@@ -0,0 +1,87 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from weather.helpers import cache, fetch, forecast, harmonics, instrument, scheduler
+from weather.helpers.configure import location_timezone
+
+# one bulk NOAA request covers this many days, so most windows are answered from the cached arrays
+prefetch_days = 28
+step = np.timedelta64(6, "m")
+noaa_host = "api.tidesandcurrents.noaa.gov"
+predictions_url = (
+    "https://api.tidesandcurrents.noaa.gov/api/prod/datagetter?product=predictions&datum=MLLW&units=metric"
+    "&time_zone=gmt&format=json&station={station}&begin_date={begin}&end_date={end}"
+)
+
+
+def download_predictions(station_id, begin, end, station=None):
+    """Fetch MLLW water level predictions for [begin, end] (UTC dates) in one request, as arrays.
+
+    station can stand in for the NOAA API: a class whose get_data returns a date_time-indexed predicted_wl frame.
+    """
+    if station is None:
+        url = predictions_url.format(station=station_id, begin=begin.strftime("%Y%m%d"), end=end.strftime("%Y%m%d"))
+        response = scheduler.get(url, fetch.get_session())
+        response.raise_for_status()
+        data = response.json()
+        if "error" in data:
+            raise ValueError(data["error"]["message"])
+        time_utc = np.asarray([p["t"] for p in data["predictions"]]).astype(forecast.time_dtype)
+        water_level = np.asarray([p["v"] for p in data["predictions"]]).astype(forecast.value_dtype)
+    else:
+
+        def request():
+            return station(station_id).get_data(
+                begin_date=begin.strftime("%Y%m%d"),
+                end_date=end.strftime("%Y%m%d"),
+                product="predictions",
+                datum="MLLW",
+                units="metric",
+                time_zone="gmt",
+            )
+
+        predictions = scheduler.run(noaa_host, ("predictions", station_id, begin, end), request).reset_index()
+        time_utc = predictions["date_time"].to_numpy().astype(forecast.time_dtype)
+        water_level = predictions["predicted_wl"].to_numpy(dtype=forecast.value_dtype)
+    return {"begin": begin, "end": end, "time_utc": time_utc, "water_level": water_level}
+
+
+@instrument.timed
+def get_predictions(station_id, begin, end, mode="use", station=None):
+    """Return cached predictions for station_id covering [begin, end], prefetching a long window when they don't."""
+    predictions = cache.get("tides", station_id) if mode == "use" else None
+    if predictions is None or predictions["begin"] > begin or predictions["end"] < end:
+        span = max(timedelta(days=prefetch_days), end - begin)
+        predictions = download_predictions(station_id, begin, begin + span, station)
+        if mode != "off":
+            cache.put("tides", station_id, value=predictions)
+    return predictions
+
+
+@instrument.timed
+def get_tides(loc_config, d, station=None):
+    """Water level predictions on a 6-minute local time grid from yesterday through n_days + 1 days ahead.
+
+    With -tide_model they are computed locally from the station's harmonic constituents instead of NOAA predictions.
+    """
+    begin, end = date.today() - timedelta(days=1), date.today() + timedelta(days=d["n_days"] + 1)
+    local_time = np.datetime64(begin, "m") + np.arange((end - begin).days * 24 * 10 + 1) * step
+    time_utc = local_time - forecast.utc_offsets(local_time, location_timezone(loc_config))
+
+    if d.get("tide_model"):
+        station = harmonics.get_constituents(loc_config["tide_station"], mode=cache.cache_mode(d))
+        water_level = harmonics.predict(station["constituents"], time_utc, station["datum_offset"])
+        return {"local_time": local_time, "water_level": water_level.astype(forecast.value_dtype)}
+
+    predictions = get_predictions(
+        loc_config["tide_station"],
+        time_utc[0].astype("datetime64[D]").astype(date),
+        time_utc[-1].astype("datetime64[D]").astype(date),
+        mode=cache.cache_mode(d),
+        station=station,
+    )
+    water_level = np.interp(
+        time_utc.astype(np.int64), predictions["time_utc"].astype(np.int64), predictions["water_level"]
+    ).astype(forecast.value_dtype)
+    return {"local_time": local_time, "water_level": water_level}
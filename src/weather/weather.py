@@ -1,24 +1,20 @@
 #!/usr/bin/env python3
 """Utilities for local weather plotting."""
 
-# base imports
+# base imports; network, NumPy and plotting dependencies are imported only on the code paths that use them,
+# so config-only commands (-list, -set_location, -rm_location) start quickly
 import argparse
-import json
-import re
+import os
 from contextlib import suppress
-from datetime import date, timedelta
 from pathlib import Path
-from pprint import pprint
 
-import noaa_coops as nc
-import requests
-
-from weather.helpers import plotting, scrape
-from weather.helpers.configure import config_path, init_config, reformat
+from weather.helpers import instrument
+from weather.helpers.configure import init_config, reformat, resolve_timezone, update_config
 
 
 def add_location(config):
-    loc_config = {}
+    from weather.helpers import provision
+
     aliases = list(config.keys())
     alias = ""
     while alias == "":
@@ -26,29 +22,21 @@ def add_location(config):
         if alias in config.keys():
             alias = ""
             print("\nAlias already exists in keys.\n")
-    loc_config["weather_hash"] = ""
-    match = None
-    while match is None:
-        if loc_config["weather_hash"] == "":
-            input_str = "Please navigate to the weather.com page for the location and enter the URL below. The url should follow the format (https://weather.com/weather/[timeframe]/l/[location_hash])"
-        else:
-            input_str = "There was a problem verifying your location. Please verify your entry and try again:"
+    loc_config = None
+    input_str = "Please navigate to the weather.com page for the location and enter the URL below. The url should follow the format (https://weather.com/weather/[timeframe]/l/[location_hash])"
+    while loc_config is None:
         with suppress(ValueError):
-            loc_config["weather_hash"] = Path(input(reformat(input_str, input_type="input"))).stem
-            page_text = requests.get(f"https://weather.com/weather/hourly/l/{loc_config['weather_hash']}").text
-            # get latitude and logitude by regex to ensure we've found a page
-            match = re.search(r'"latitude\\":(.*?),\\"longitude\\":(.*?),', page_text)
-    config[alias] = loc_config
-    config[alias]["lat_lon"] = (float(match.group(1)), float(match.group(2)))
-    config[alias]["name"] = (
-        re.search(r"Hourly Weather Forecast for(.*?)- The Weather Channel", page_text).group(1).strip()
-    )
+            loc_config = provision.location_entry(input(reformat(input_str, input_type="input")))
+        input_str = "There was a problem verifying your location. Please verify your entry and try again:"
+    loc_config["timezone"] = resolve_timezone(loc_config["lat_lon"])
 
-    json.dump(config, open(config_path, "w"))
+    update_config(lambda config: {**config, alias: loc_config})
     print("\n\tLocation successfully initialized and saved.\n")
 
 
 def add_tides(config):
+    from weather.helpers import provision
+
     aliases = list(config.keys())
     alias = ""
     while alias.upper() not in aliases:
@@ -57,32 +45,40 @@ def add_tides(config):
         "\n\tEnter the 7-digit NOAA station ID for this location. Stations can be found at https://tidesandcurrents.noaa.gov/\n\t"
     )
     try:
-        nc_station = nc.Station(int(station))
-        nc_station.get_data(
-            begin_date=(date.today() - timedelta(days=1)).strftime("%Y%m%d"),
-            end_date=(date.today() + timedelta(days=1)).strftime("%Y%m%d"),
-            product="predictions",
-            datum="MLLW",
-            units="metric",
-            time_zone="gmt",
-        )
-    except:
+        provision.validate_station(int(station))
+    except ValueError:
         raise ValueError(
             f"No valid datum value for MLLW ***station={station} Please check the station ID and try again."
         )
 
-    config[alias]["tide_station"] = int(station)
-    json.dump(config, open(config_path, "w"))
+    def set_station(config):
+        config[alias]["tide_station"] = int(station)
+        # locations saved before timezones were stored get theirs resolved here, once
+        if not config[alias].get("timezone"):
+            config[alias]["timezone"] = resolve_timezone(config[alias]["lat_lon"])
+        return config
+
+    update_config(set_station)
     print("\n\tTide station successfully initialized and saved.\n")
 
 
+def import_locations(path):
+    from weather.helpers import provision
+
+    added, failed = provision.provision(provision.read_entries(path))
+    for alias, loc_config in added.items():
+        print(f"\t{alias}: {loc_config['name']}")
+    for alias, reason in failed.items():
+        print(f"\t{alias}: skipped. {reason}")
+    print(f"\n\t{len(added)} location(s) imported, {len(failed)} skipped.\n")
+
+
 def rm_location(config):
     aliases = list(config.keys())
     rm_loc = ""
     while rm_loc.upper() not in aliases:
         rm_loc = input(f"\tWhich location would you like to remove? Available aliases are: {aliases}\n\t").upper()
-    del config[rm_loc]
-    json.dump(config, open(config_path, "w"))
+    update_config(lambda config: {k: v for k, v in config.items() if k != rm_loc})
     print("\n\tLocation metadata successfully deleted.\n")
 
 
@@ -93,20 +89,61 @@ def set_location(config):
         set_loc = input(
             f"\tWhich location would you like to set as default? Available aliases are: {aliases}\n\t"
         ).upper()
-    config = {**{set_loc: config[set_loc]}, **{k: v for k, v in config.items() if k != set_loc}}
-    json.dump(config, open(config_path, "w"))
+    update_config(lambda config: {**{set_loc: config[set_loc]}, **{k: v for k, v in config.items() if k != set_loc}})
     print("\n\tLocation successfully set as default.\n")
 
 
 def list_locations(config):
+    from pprint import pprint
+
     print("\nAvailable locations are:")
     pprint({alias: config[alias]["name"] for alias in config.keys()})
     print("")
 
 
-def main():
-    config = init_config()
+def watch(loc_configs, d, aliases=None):
+    """Redraw terminal forecasts in place every -interval seconds until interrupted."""
+    import time
+
+    import plotext
 
+    from weather.helpers import pipeline, plotting
+
+    memo = {}
+    try:
+        while True:
+            try:
+                weather_dicts = pipeline.get_forecasts(loc_configs, d, memo=memo, aliases=aliases)
+            except Exception as e:
+                # keep the last frame on screen and try again at the next refresh
+                print(f"\tRefresh failed at {time.strftime('%H:%M:%S')}: {e!r}; retrying in {d['interval']}s.")
+            else:
+                plotext.clear_terminal()
+                for weather_dict in weather_dicts:
+                    plotting.plot_terminal(weather_dict, d)
+                print(
+                    f"\tUpdated {time.strftime('%H:%M:%S')}; refreshing every {d['interval']}s. Press Ctrl+C to exit."
+                )
+            time.sleep(d["interval"])
+    except KeyboardInterrupt:
+        print("")
+
+
+def print_accuracy(config, aliases, d):
+    import numpy as np
+
+    from weather.helpers import accuracy, forecast
+    from weather.helpers.configure import location_timezone
+
+    for alias in aliases:
+        # stored valid times are in the location's local time
+        end = forecast.local_now(location_timezone(config[alias]))
+        start = end - np.timedelta64(d["accuracy"], "D")
+        print(accuracy.format_stats(alias, accuracy.alias_accuracy(alias, start, end)))
+    print("")
+
+
+def main():
     # establish parser to pull in projects to view
     parser = argparse.ArgumentParser(description="Utilities for local weather plotting.")
 
@@ -129,12 +166,96 @@ def main():
         default=False,
         help="If provided, include today's history in hourly plotting.",
     )
+    parser.add_argument(
+        "-lookback",
+        type=int,
+        default=0,
+        help="With -d, also show this many previous days of observations from the local history store.",
+    )
+    parser.add_argument(
+        "-accuracy",
+        type=int,
+        nargs="?",
+        const=30,
+        help="Report forecast bias and MAE by lead time over the last ACCURACY days (default 30) of local history.",
+    )
     parser.add_argument(
         "-tide",
         action=argparse.BooleanOptionalAction,
         default=False,
         help="If provided, plot tides when 'tide_station' has been specified in config.json.",
     )
+    parser.add_argument(
+        "-tide_model",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided with -tide, predict tides locally from the station's harmonic constituents.",
+    )
+    parser.add_argument(
+        "-all",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, plot every saved location.",
+    )
+    parser.add_argument(
+        "-aliases",
+        type=str,
+        help="Comma-separated aliases of saved locations to plot together, e.g. -aliases HOME,WORK.",
+    )
+    parser.add_argument(
+        "-terminal",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, plot in the terminal instead of a matplotlib window.",
+    )
+    parser.add_argument(
+        "-watch",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, keep running and redraw the terminal forecast every -interval seconds.",
+    )
+    parser.add_argument(
+        "-interval",
+        type=int,
+        default=300,
+        help="Seconds between redraws with -watch. Sources are only refetched once their cache TTL expires.",
+    )
+    parser.add_argument(
+        "-serve",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, serve /forecast/{alias}?n_days=N and /tides/{alias}?n_days=N as JSON on localhost.",
+    )
+    parser.add_argument(
+        "-port",
+        type=int,
+        default=8000,
+        help="Port for -serve.",
+    )
+    parser.add_argument(
+        "-output",
+        type=str,
+        help="Directory to render forecast images into (one ALIAS.FORMAT file per location) instead of displaying them.",
+    )
+    parser.add_argument(
+        "-format",
+        type=str,
+        default="png",
+        choices=["png", "svg"],
+        help="Image format used with -output.",
+    )
+    parser.add_argument(
+        "-no_cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, neither read nor write the local response cache.",
+    )
+    parser.add_argument(
+        "-refresh",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, ignore cached responses and re-download (refreshing the cache).",
+    )
     parser.add_argument(
         "-add_location",
         action=argparse.BooleanOptionalAction,
@@ -159,22 +280,63 @@ def main():
         default=False,
         help="If provided, set a specified saved location as default.",
     )
+    parser.add_argument(
+        "-import",
+        type=str,
+        default=None,
+        help="Bulk-add locations from a CSV (alias,url,tide_station columns) or JSON file, validating them concurrently.",
+    )
     parser.add_argument(
         "-list",
         action=argparse.BooleanOptionalAction,
         default=False,
         help="If provided, list all available locations.",
     )
+    parser.add_argument(
+        "-profile",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, print time spent per stage and bytes downloaded after the run.",
+    )
+    parser.add_argument(
+        "-profile_json",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="If provided, print the -profile report as JSON instead.",
+    )
     d = vars(parser.parse_args())
 
-    if sum([d["add_location"], d["add_tides"], d["rm_location"], d["set_location"], d["list"]]) > 1:
+    profile = d["profile"] or d["profile_json"]
+    if profile:
+        instrument.enable()
+    try:
+        with instrument.stage("main.init_config"):
+            config = init_config()
+        with instrument.stage("main.run"):
+            run(config, d)
+    finally:
+        if profile:
+            instrument.disable()
+            instrument.report("json" if d["profile_json"] else "text")
+
+
+def run(config, d):
+    commands = [
+        d["add_location"],
+        d["add_tides"],
+        d["rm_location"],
+        d["set_location"],
+        d["import"] is not None,
+        d["list"],
+    ]
+    if sum(commands) > 1:
         raise ValueError(
             reformat(
-                "Only one of -add_location, -add_tides, -rm_location, -set_location, or -list may be provided at one time.",
+                "Only one of -add_location, -add_tides, -rm_location, -set_location, -import, or -list may be provided at one time.",
                 input_type="error",
             )
         )
-    elif sum([d["add_location"], d["add_tides"], d["rm_location"], d["set_location"], d["list"]]) == 1:
+    elif sum(commands) == 1:
         if d["add_location"]:
             add_location(config)
         elif d["add_tides"]:
@@ -183,6 +345,8 @@ def main():
             rm_location(config)
         elif d["set_location"]:
             set_location(config)
+        elif d["import"] is not None:
+            import_locations(d["import"])
         elif d["list"]:
             list_locations(config)
     else:
@@ -193,43 +357,52 @@ def main():
                     input_type="error",
                 )
             )
+        elif d["serve"]:
+            from weather.helpers import server
+
+            server.serve(d, port=d["port"])
+            return
+        elif d["all"]:
+            aliases = list(config.keys())
+        elif d["aliases"] is not None:
+            aliases = [alias.strip().upper() for alias in d["aliases"].split(",") if alias.strip()]
         elif d["alias"] is None:
-            loc_config = config[list(config.keys())[0]]
+            aliases = [list(config.keys())[0]]
         else:
-            d["alias"] = d["alias"].upper()
-            if d["alias"] in config.keys():
-                loc_config = config[d["alias"]]
-            else:
-                raise ValueError(
-                    reformat(
-                        f"Provided alias not found in config. Available aliases are {list(config.keys())}",
-                        input_type="error",
-                    )
+            aliases = [d["alias"].upper()]
+        missing = [alias for alias in aliases if alias not in config.keys()]
+        if missing:
+            raise ValueError(
+                reformat(
+                    f"Provided alias not found in config. Available aliases are {list(config.keys())}",
+                    input_type="error",
                 )
+            )
 
-        soup = ""
-        for page in ["today", "hourbyhour", "monthly"]:
-            soup += requests.get(f"https://weather.com/weather/{page}/l/{loc_config['weather_hash']}").text
+        if d["accuracy"] is not None:
+            print_accuracy(config, aliases, d)
+            return
+        if d["watch"]:
+            watch([config[alias] for alias in aliases], d, aliases)
+            return
 
-        if d["n_days"] <= 2:
-            if not d["d"]:
-                weather_dict = scrape.get_weather_hourly(soup)
-            else:
-                weather_dict = scrape.get_weather_hourly_h(soup)
-            weather_dict = {k: v[: d["n_days"] * 24] for k, v in weather_dict.items()}
-            sun_dict = scrape.get_sun(soup, d)
-            weather_dict.update(sun_dict)
-        else:
-            historical_temp_dict = scrape.get_historical_temperatures(soup, d)
-            weather_dict = scrape.get_weather_daily(soup)
-            weather_dict.update(historical_temp_dict)
-        if "tide_station" in loc_config.keys():
-            tide_dict = scrape.get_tides(loc_config, d)
-            weather_dict.update(tide_dict)
+        with instrument.stage("main.imports"):
+            from weather.helpers import pipeline, plotting
 
-        weather_dict["name"] = loc_config["name"]
+        weather_dicts = pipeline.get_forecasts([config[alias] for alias in aliases], d, aliases=aliases)
 
-        plotting.plot_matplot(weather_dict, d)
+        if d["output"] is not None:
+            os.makedirs(d["output"], exist_ok=True)
+            paths = [Path(d["output"]) / f"{alias}.{d['format']}" for alias in aliases]
+            for path in plotting.render_images(weather_dicts, d, fmt=d["format"], paths=paths):
+                print(f"\tSaved {path}")
+        elif d["terminal"]:
+            for weather_dict in weather_dicts:
+                plotting.plot_terminal(weather_dict, d)
+        elif len(weather_dicts) == 1:
+            plotting.plot_matplot(weather_dicts[0], d)
+        else:
+            plotting.plot_matplot_grid(weather_dicts, d)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+sys.path.insert(0, str(Path(__file__).parents[1] / "benchmarks"))
+
+
+@pytest.fixture(autouse=True)
+def local_store(tmp_path, monkeypatch):
+    """Keep the config, response cache, history store and scheduler state of each test to itself."""
+    from weather.helpers import cache, configure, history, scheduler
+
+    monkeypatch.setattr(configure, "config_path", str(tmp_path / "config.json"))
+    monkeypatch.setattr(cache, "cache_path", str(tmp_path / "cache"))
+    monkeypatch.setattr(history, "history_path", str(tmp_path / "history"))
+    scheduler._hosts.clear()
+    return tmp_path
@@ -0,0 +1,34 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from weather.helpers import configure
+
+
+def add_alias(alias):
+    def add(config):
+        config[alias] = {"name": alias}
+        return config
+
+    configure.update_config(add)
+
+
+def test_concurrent_updates_lose_no_writes():
+    aliases = [f"LOC{i}" for i in range(32)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(add_alias, aliases))
+
+    with open(configure.config_path) as f:
+        assert sorted(json.load(f)) == sorted(aliases)
+    assert not [name for name in os.listdir(os.path.dirname(configure.config_path)) if name.endswith(".tmp")]
+
+
+def test_unchanged_config_is_not_rewritten():
+    config = {"HOME": {"name": "Home"}}
+    assert configure.save_config(config)
+    mtime = os.stat(configure.config_path).st_mtime_ns
+
+    assert not configure.save_config(config)
+    configure.update_config(lambda config: config)
+    assert os.stat(configure.config_path).st_mtime_ns == mtime
+    assert configure.load_config() == config
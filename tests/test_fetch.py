@@ -0,0 +1,36 @@
+import json
+import time
+
+import numpy as np
+from fixtures import make_pages
+from stub import start_stub_server
+
+from weather.helpers import fetch, pipeline, tides
+
+DELAY = 0.3
+
+
+def test_pages_and_tides_are_fetched_concurrently(monkeypatch):
+    pages = {page: text.encode() for page, text in make_pages().items()}
+    pages["predictions"] = json.dumps({"predictions": [{"t": "2000-01-01 00:00", "v": "1.0"}]}).encode()
+    server, base_url = start_stub_server(body=lambda path: pages[path.split("/")[2].split("?")[0]], delay=DELAY)
+    monkeypatch.setattr(fetch, "weather_url", base_url + "/weather/{page}/l/{weather_hash}")
+    monkeypatch.setattr(tides, "predictions_url", base_url + "/noaa/predictions?{station}{begin}{end}")
+    loc_config = {
+        "weather_hash": "stub",
+        "name": "Stub",
+        "lat_lon": [40.71, -74.01],
+        "timezone": "America/New_York",
+        "tide_station": 8518750,
+    }
+    d = {"n_days": 2, "d": False, "tide": True, "no_cache": True}
+
+    start = time.perf_counter()
+    weather_dict = pipeline.get_forecasts([loc_config], d)[0]
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    # four requests of DELAY each: about the slowest one when concurrent, against 4 * DELAY in sequence
+    assert server.requests == 4
+    assert wall < 2 * DELAY
+    assert np.all(weather_dict["water_level"] == 1)
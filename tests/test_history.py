@@ -0,0 +1,38 @@
+import numpy as np
+
+from weather.helpers import forecast, history, scrape
+
+start = np.datetime64("2026-06-10T00:00")
+
+
+def hours(kind, first, n, issued):
+    times = start + (first + np.arange(n)) * forecast.one_hour
+    obs = {a: forecast.empty(a, n) for a in scrape.hour_attrs}
+    obs["validTimeLocal"] = times.astype(forecast.time_dtype)
+    obs["temperature"] = np.arange(first, first + n, dtype=forecast.value_dtype)
+    return history.to_records(obs, kind, np.datetime64(issued, "m"))
+
+
+def stored(kind):
+    return history.read("TEST", kind, start, start + np.timedelta64(3, "D"))
+
+
+def test_forecast_issuance_is_written_once():
+    issued = start - forecast.one_hour
+    history.append("TEST", "hourly", hours("hourly", 0, 48, issued))
+    history.append("TEST", "hourly", hours("hourly", 0, 48, issued))
+    assert len(stored("hourly")) == 48
+
+    history.append("TEST", "hourly", hours("hourly", 1, 48, issued + forecast.one_hour))
+    assert len(stored("hourly")) == 96
+    assert len(np.unique(stored("hourly")["issued"])) == 2
+
+
+def test_observations_only_extend_past_the_last_stored_time():
+    history.append("TEST", "observed", hours("observed", 0, 10, start))
+    history.append("TEST", "observed", hours("observed", 5, 10, start + 5 * forecast.one_hour))
+
+    observed = stored("observed")
+    assert len(observed) == 15
+    assert np.array_equal(observed["temperature"], np.arange(15))
+    assert np.all(np.diff(observed["validTimeLocal"]) == forecast.one_hour)
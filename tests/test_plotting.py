@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+import plotext
+import pytest
+
+from weather.helpers import forecast, plotting, solar
+
+
+def hourly_dict(start, n_hours):
+    valid_times = start + np.arange(n_hours) * forecast.one_hour
+    midnight = np.datetime64(date.today(), "m")
+    return {
+        "name": "Test",
+        "validTimeLocal": valid_times,
+        **{k: np.linspace(0, 100, n_hours) for k in ["temperature", "temperatureFeelsLike", "cloudCover", "windSpeed"]},
+        "precipChance": np.zeros(n_hours),
+        "windDirectionCardinal": np.zeros(n_hours, dtype=forecast.code_dtype),
+        "sunriseTimeLocal": midnight + np.array([7, 31], dtype="timedelta64[h]"),
+        "sunsetTimeLocal": midnight + np.array([18, 42], dtype="timedelta64[h]"),
+    }
+
+
+@pytest.fixture
+def plotted(monkeypatch):
+    """Record the x values and x ticks plot_terminal hands to plotext."""
+    calls = {"x": [], "ticks": None}
+    monkeypatch.setattr(plotext, "plot", lambda x, y, label=None: calls["x"].append(x))
+    monkeypatch.setattr(plotext, "xticks", lambda ticks, labels: calls.update(ticks=(ticks, labels)))
+    monkeypatch.setattr(plotext, "show", lambda: None)
+    monkeypatch.setattr(plotting, "set_entry_size_manual", lambda **kwargs: None)
+    return calls
+
+
+def test_terminal_hourly_starts_at_first_forecast_hour(plotted):
+    start = np.datetime64(date.today(), "h") + 13 * forecast.one_hour
+    weather_dict = hourly_dict(start, 48)
+    plotting.plot_terminal(weather_dict, {"n_days": 2, "d": False})
+
+    ticks, labels = plotted["ticks"]
+    assert all(x[0] == 0 for x in plotted["x"])
+    assert labels[ticks.index(0)] == forecast.hour_labels(weather_dict["validTimeLocal"][:1])[0]
+
+
+def test_terminal_history_starts_at_midnight(plotted):
+    midnight = np.datetime64(date.today(), "h")
+    weather_dict = hourly_dict(midnight, 48)
+    plotting.plot_terminal(weather_dict, {"n_days": 2, "d": True, "lookback": 1})
+
+    first_x = forecast.hours_since(weather_dict["validTimeLocal"][0], midnight - 24 * forecast.one_hour)
+    assert all(x[0] == first_x for x in plotted["x"])
+
+
+@pytest.mark.parametrize("start, night_spans", [(date(2026, 6, 10), 0), (date(2026, 12, 10), 1)])
+def test_draw_forecast_high_latitude(start, night_spans):
+    from matplotlib.figure import Figure
+
+    weather_dict = hourly_dict(np.datetime64(start, "h"), 48)
+    weather_dict.update(solar.get_sun({"lat_lon": [69.65, 18.96], "timezone": "Europe/Oslo"}, start, 3))
+    ax = Figure().add_subplot()
+    plotting.draw_forecast(ax, weather_dict, {"n_days": 2, "d": True, "tide": False})
+
+    # polar day leaves the plot unshaded, polar night shades all of it
+    assert len(ax.patches) == night_spans
@@ -0,0 +1,30 @@
+import json
+
+from weather.helpers import configure, provision
+
+
+def test_duplicate_and_incomplete_entries_are_skipped(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        provision,
+        "location_entry",
+        lambda url, tide_station=None, station=None: {"weather_hash": url, "name": url, "lat_lon": [40.71, -74.01]},
+    )
+    monkeypatch.setattr(provision, "resolve_timezone", lambda lat_lon: "America/New_York")
+    path = tmp_path / "locations.json"
+    path.write_text(
+        json.dumps(
+            [
+                {"alias": "home", "url": "https://weather.com/weather/today/l/a"},
+                {"alias": "work", "url": "https://weather.com/weather/today/l/b"},
+                {"alias": "HOME", "url": "https://weather.com/weather/today/l/c"},
+                {"alias": "cabin"},
+            ]
+        )
+    )
+
+    added, failed = provision.provision(provision.read_entries(path))
+
+    assert list(added) == ["WORK"]
+    assert set(failed) == {"HOME", "CABIN"}
+    assert "2 times" in failed["HOME"]
+    assert list(configure.load_config()) == ["WORK"]
@@ -0,0 +1,47 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub import start_stub_server
+
+from weather.helpers import fetch, scheduler
+
+
+def get_all(urls):
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        return list(executor.map(lambda url: scheduler.get(url, fetch.get_session()), urls))
+
+
+def test_identical_requests_share_one_upstream_request():
+    server, base_url = start_stub_server(body=b"page", delay=0.2)
+    responses = get_all([base_url + "/page"] * 16)
+    server.shutdown()
+
+    assert server.requests == 1
+    assert all(response.status_code == 200 and response.content == b"page" for response in responses)
+    assert scheduler.counters()["127.0.0.1"]["coalesced"] == 15
+
+
+def test_throttled_requests_are_retried(monkeypatch):
+    # the stub's window is one second, so retry just after it has passed
+    monkeypatch.setattr(scheduler, "retry_delay", lambda attempt, response=None: 1.05)
+    server, base_url = start_stub_server(body=b"page", rate_limit=2)
+    responses = get_all([f"{base_url}/page{i}" for i in range(4)])
+    server.shutdown()
+
+    assert server.throttled > 0
+    assert all(response.status_code == 200 for response in responses)
+    assert scheduler.counters()["127.0.0.1"]["retries"] == server.throttled
+
+
+def test_token_bucket_paces_requests_under_the_upstream_limit(monkeypatch):
+    monkeypatch.setitem(scheduler.host_limits, "127.0.0.1", {"concurrency": None, "rate": 4.0, "burst": 1})
+    server, base_url = start_stub_server(body=b"page", rate_limit=6)
+    start = time.perf_counter()
+    responses = get_all([f"{base_url}/page{i}" for i in range(6)])
+    wall = time.perf_counter() - start
+    server.shutdown()
+
+    # one request from the burst, then one every 1 / rate seconds
+    assert server.throttled == 0
+    assert all(response.status_code == 200 for response in responses)
+    assert wall >= 5 / 4 - 0.05
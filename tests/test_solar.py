@@ -0,0 +1,32 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from weather.helpers import solar
+
+tromso = {"lat_lon": [69.65, 18.96], "timezone": "Europe/Oslo"}
+new_york = {"lat_lon": [40.71, -74.01], "timezone": "America/New_York"}
+
+
+@pytest.mark.parametrize("start, daylight", [(date(2026, 6, 10), 24), (date(2026, 12, 10), 0)])
+def test_polar_days_keep_one_entry_per_day(start, daylight):
+    sun_dict = solar.get_sun(tromso, start, 3)
+
+    assert all(len(column) == 3 for column in sun_dict.values())
+    assert np.isnat(sun_dict["sunriseTimeLocal"]).all() and np.isnat(sun_dict["sunsetTimeLocal"]).all()
+    assert (sun_dict["daylightHours"] == daylight).all()
+    assert not np.isnat(sun_dict["solarNoonTimeLocal"]).any()
+
+
+def test_daylight_periods():
+    starts, ends = solar.daylight_periods(solar.get_sun(tromso, date(2026, 6, 10), 2))
+    assert starts.tolist() == np.array(["2026-06-10", "2026-06-11"], dtype="datetime64[m]").tolist()
+    assert (ends - starts == np.timedelta64(1, "D")).all()
+
+    starts, ends = solar.daylight_periods(solar.get_sun(tromso, date(2026, 12, 10), 2))
+    assert len(starts) == len(ends) == 0
+
+    sun_dict = solar.get_sun(new_york, date(2026, 6, 10), 2)
+    starts, ends = solar.daylight_periods(sun_dict)
+    assert (starts == sun_dict["sunriseTimeLocal"]).all() and (ends == sun_dict["sunsetTimeLocal"]).all()